@@ -1,289 +1,659 @@
-import { MongoClient } from 'mongodb'
-import { v4 as uuidv4 } from 'uuid'
 import { NextResponse } from 'next/server'
-
-// MongoDB connection
-let client
-let db
-
-async function connectToMongo() {
-  if (!client) {
-    client = new MongoClient(process.env.MONGO_URL)
-    await client.connect()
-    db = client.db(process.env.DB_NAME || 'salil_music_db')
-  }
-  return db
-}
+import { createHash, timingSafeEqual } from 'crypto'
+import { createReadStream, promises as fs } from 'fs'
+import path from 'path'
+import { Readable } from 'stream'
+import {
+  PLAYLIST_ORDER,
+  PUBLIC_FIELDS,
+  cachedRead,
+  getCacheStats,
+  getCatalogVersion,
+  getCurrentPlaylist,
+  getSchedule,
+  getTimeBlocks,
+  initializeDatabase,
+  subscribeToCatalog
+} from '@/lib/catalog'
+import { bulkPlaylists, bulkSongs } from '@/lib/catalog-bulk'
+import { renderPrometheus, timePhase, withRequestMetrics } from '@/lib/metrics'
+import { connectToMongo, poolOptions } from '@/lib/mongo'
 
 // Helper function to handle CORS
 function handleCORS(response) {
   response.headers.set('Access-Control-Allow-Origin', process.env.CORS_ORIGINS || '*')
   response.headers.set('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, OPTIONS')
-  response.headers.set('Access-Control-Allow-Headers', 'Content-Type, Authorization')
+  response.headers.set('Access-Control-Allow-Headers', 'Content-Type, Authorization, If-None-Match, Last-Event-ID')
+  response.headers.set('Access-Control-Expose-Headers', 'ETag, Cache-Control, Accept-Ranges, Content-Range, Content-Length, Link, Server-Timing')
   response.headers.set('Access-Control-Allow-Credentials', 'true')
   return response
 }
 
+// Catalog writes are for operators, never for cross-origin pages: they get no
+// CORS headers at all and need `Authorization: Bearer $CATALOG_ADMIN_TOKEN`
+const WRITE_ROUTES = ['/playlists/bulk', '/songs/bulk']
+
 // OPTIONS handler for CORS
-export async function OPTIONS() {
+export async function OPTIONS(request, { params }) {
+  const route = `/${(params.path || []).join('/')}`
+  if (WRITE_ROUTES.includes(route)) {
+    return new NextResponse(null, { status: 204 })
+  }
   return handleCORS(new NextResponse(null, { status: 200 }))
 }
 
-// Time blocks configuration
-const timeBlocks = [
-  { id: 'early-morning', name: 'Early Morning', start_hour: 4, end_hour: 8 },
-  { id: 'morning', name: 'Morning', start_hour: 8, end_hour: 12 },
-  { id: 'afternoon', name: 'Afternoon', start_hour: 12, end_hour: 16 },
-  { id: 'evening', name: 'Evening', start_hour: 16, end_hour: 20 },
-  { id: 'night', name: 'Night', start_hour: 20, end_hour: 24 },
-  { id: 'late-night', name: 'Late Night', start_hour: 0, end_hour: 4 }
-]
-
-// Sample playlists data
-const samplePlaylists = [
-  {
-    id: uuidv4(),
-    name: 'Dawn Serenity',
-    time_block: 'early-morning',
-    start_time: '04:00',
-    end_time: '08:00'
-  },
-  {
-    id: uuidv4(),
-    name: 'Coffee & Energy',
-    time_block: 'morning',
-    start_time: '08:00',
-    end_time: '12:00'
-  },
-  {
-    id: uuidv4(),
-    name: 'Afternoon Flow',
-    time_block: 'afternoon',
-    start_time: '12:00',
-    end_time: '16:00'
-  },
-  {
-    id: uuidv4(),
-    name: 'Golden Hour',
-    time_block: 'evening',
-    start_time: '16:00',
-    end_time: '20:00'
-  },
-  {
-    id: uuidv4(),
-    name: 'Night Vibes',
-    time_block: 'night',
-    start_time: '20:00',
-    end_time: '00:00'
-  },
-  {
-    id: uuidv4(),
-    name: 'Deep Sleep',
-    time_block: 'late-night',
-    start_time: '00:00',
-    end_time: '04:00'
-  }
-]
-
-// Sample songs data
-const sampleSongs = [
-  // Early Morning songs
-  { id: uuidv4(), playlist_id: null, title: 'Morning Mist', artist: 'Nature Sounds', url: '/music/03.mp3', time_block: 'early-morning' },
-  { id: uuidv4(), playlist_id: null, title: 'Gentle Sunrise', artist: 'Ambient Dreams', url: '/music/05.mp3', time_block: 'early-morning' },
-  { id: uuidv4(), playlist_id: null, title: 'Bird Song Symphony', artist: 'Forest Echoes', url: '/music/06.mp3', time_block: 'early-morning' },
-  
-  // Morning songs
-  { id: uuidv4(), playlist_id: null, title: 'Fresh Start', artist: 'Positive Vibes', url: '/music/03.mp3', time_block: 'morning' },
-  { id: uuidv4(), playlist_id: null, title: 'Morning Motivation', artist: 'Upbeat Collective', url: '/music/05.mp3', time_block: 'morning' },
-  { id: uuidv4(), playlist_id: null, title: 'New Day Rising', artist: 'Energy Boost', url: '/music/06.mp3', time_block: 'morning' },
-  
-  // Afternoon songs
-  { id: uuidv4(), playlist_id: null, title: 'Focus Mode', artist: 'Productivity Mix', url: '/music/03.mp3', time_block: 'afternoon' },
-  { id: uuidv4(), playlist_id: null, title: 'Steady Rhythm', artist: 'Work Beats', url: '/music/05.mp3', time_block: 'afternoon' },
-  { id: uuidv4(), playlist_id: null, title: 'Creative Energy', artist: 'Flow State', url: '/music/06.mp3', time_block: 'afternoon' },
-  
-  // Evening songs
-  { id: uuidv4(), playlist_id: null, title: 'Sunset Dreams', artist: 'Chill Collective', url: '/music/07.mp3', time_block: 'evening' },
-  { id: uuidv4(), playlist_id: null, title: 'Evening Breeze', artist: 'Relaxed Vibes', url: '/music/08.mp3', time_block: 'evening' },
-  { id: uuidv4(), playlist_id: null, title: 'Twilight Glow', artist: 'Ambient Hour', url: '/music/09.mp3', time_block: 'evening' },
-  
-  // Night songs
-  { id: uuidv4(), playlist_id: null, title: 'City Lights', artist: 'Urban Nights', url: '/music/07.mp3', time_block: 'night' },
-  { id: uuidv4(), playlist_id: null, title: 'Midnight Groove', artist: 'Night Owls', url: '/music/08.mp3', time_block: 'night' },
-  { id: uuidv4(), playlist_id: null, title: 'Starlit Sky', artist: 'Evening Jazz', url: '/music/09.mp3', time_block: 'night' },
-  
-  // Late Night songs
-  { id: uuidv4(), playlist_id: null, title: 'Peaceful Slumber', artist: 'Sleep Sounds', url: '/music/03.mp3', time_block: 'late-night' },
-  { id: uuidv4(), playlist_id: null, title: 'Night Rain', artist: 'Calm Waters', url: '/music/05.mp3', time_block: 'late-night' },
-  { id: uuidv4(), playlist_id: null, title: 'Dream State', artist: 'Soft Melodies', url: '/music/06.mp3', time_block: 'late-night' }
-]
-
-// Initialize database with sample data
-async function initializeDatabase() {
+// Returns an error response when the request may not write to the catalog, else null.
+// Writes are disabled outright while no token is configured.
+function rejectCatalogWrite(request) {
+  const token = process.env.CATALOG_ADMIN_TOKEN
+  if (!token) {
+    return NextResponse.json(
+      { error: "Catalog writes are disabled: CATALOG_ADMIN_TOKEN is not set" },
+      { status: 503 }
+    )
+  }
+
+  const match = /^Bearer\s+(.+)$/i.exec(request.headers.get('authorization') || '')
+  // Compare fixed-length digests so neither length nor content leaks through timing
+  const digest = value => createHash('sha256').update(value).digest()
+  if (!match || !timingSafeEqual(digest(match[1].trim()), digest(token))) {
+    return NextResponse.json(
+      { error: "Unauthorized" },
+      { status: 401, headers: { 'WWW-Authenticate': 'Bearer' } }
+    )
+  }
+  return null
+}
+
+function matchesIfNoneMatch(request, etag) {
+  const header = request.headers.get('if-none-match')
+  if (!header) {
+    return false
+  }
+  // If-None-Match uses weak comparison, so ignore any W/ prefix
+  return header.split(',').some(tag => {
+    const candidate = tag.trim()
+    return candidate === '*' || candidate.replace(/^W\//, '') === etag
+  })
+}
+
+// JSON response for catalog reads: strong content-hash ETag and 304 on If-None-Match.
+// Catalog edits are pushed to players (/api/catalog/events) and must show up at once,
+// so browsers, the service worker and CDNs revalidate every time instead of holding
+// a copy until the next block change; an unchanged body costs an empty 304.
+function cacheableJson(request, body) {
+  const { payload, etag } = timePhase('serialize', () => {
+    const payload = JSON.stringify(body)
+    return { payload, etag: `"${createHash('sha1').update(payload).digest('base64url')}"` }
+  })
+  const headers = {
+    'ETag': etag,
+    'Cache-Control': 'public, no-cache'
+  }
+
+  if (matchesIfNoneMatch(request, etag)) {
+    return handleCORS(new NextResponse(null, { status: 304, headers }))
+  }
+  return handleCORS(new NextResponse(payload, {
+    status: 200,
+    headers: { ...headers, 'Content-Type': 'application/json' }
+  }))
+}
+
+// Audio library served by /api/audio/:file
+const MUSIC_DIR = path.join(process.cwd(), 'public', 'music')
+
+// Content-hash ETags for audio files, recomputed only when size or mtime changes
+const audioETags = new Map()
+
+async function getAudioETag(filePath, stat) {
+  const cached = audioETags.get(filePath)
+  if (cached && cached.size === stat.size && cached.mtimeMs === stat.mtimeMs) {
+    return cached.etag
+  }
+
+  const hash = createHash('sha1')
+  for await (const chunk of createReadStream(filePath)) {
+    hash.update(chunk)
+  }
+  const etag = `"${hash.digest('base64url')}"`
+  audioETags.set(filePath, { size: stat.size, mtimeMs: stat.mtimeMs, etag })
+  return etag
+}
+
+// Resolve a single "bytes=" range against the file size.
+// Returns undefined to serve the whole file and null when the range is unsatisfiable.
+function parseByteRange(header, size) {
+  // Multi-range requests may be ignored (RFC 9110), so serve the full body
+  if (header.includes(',')) {
+    return undefined
+  }
+
+  const match = /^bytes=(\d*)-(\d*)$/.exec(header.trim())
+  if (!match || (match[1] === '' && match[2] === '')) {
+    return null
+  }
+
+  let start
+  let end
+  if (match[1] === '') {
+    // Suffix range: the last N bytes
+    const length = Number(match[2])
+    if (length === 0) {
+      return null
+    }
+    start = Math.max(size - length, 0)
+    end = size - 1
+  } else {
+    start = Number(match[1])
+    end = match[2] === '' ? size - 1 : Math.min(Number(match[2]), size - 1)
+  }
+
+  if (start > end || start >= size) {
+    return null
+  }
+  return { start, end }
+}
+
+// Stream an MP3 from the library with Range (206) support. Only the requested
+// bytes are read from disk. URLs don't change when a file is replaced (the
+// indexer and analysis re-scan in place), so caches must revalidate; an
+// unchanged file costs a 304 against its content-hash ETag.
+async function serveAudio(request, fileName) {
+  // Library paths may be nested (see scripts/index-music.mjs) but must stay inside MUSIC_DIR
+  const filePath = path.resolve(MUSIC_DIR, fileName)
+  if (!filePath.startsWith(MUSIC_DIR + path.sep) || path.extname(filePath).toLowerCase() !== '.mp3') {
+    return handleCORS(NextResponse.json({ error: "Audio file not found" }, { status: 404 }))
+  }
+
+  let stat
   try {
-    const db = await connectToMongo()
-    
-    // Clear existing data and reinitialize
-    await db.collection('playlists').deleteMany({})
-    await db.collection('songs').deleteMany({})
-    
-    // Insert sample playlists
-    await db.collection('playlists').insertMany(samplePlaylists)
-    
-    // Update songs with playlist IDs and insert them
-    const insertedPlaylists = await db.collection('playlists').find().toArray()
-    
-    const songsWithPlaylistIds = sampleSongs.map(song => {
-      const matchingPlaylist = insertedPlaylists.find(p => p.time_block === song.time_block)
-      return {
-        ...song,
-        playlist_id: matchingPlaylist ? matchingPlaylist.id : null
-      }
-    })
-    
-    await db.collection('songs').insertMany(songsWithPlaylistIds)
-    
-    console.log('Database initialized with sample data')
-  } catch (error) {
-    console.error('Database initialization error:', error)
+    stat = await fs.stat(filePath)
+  } catch {
+    return handleCORS(NextResponse.json({ error: "Audio file not found" }, { status: 404 }))
+  }
+
+  const etag = await getAudioETag(filePath, stat)
+  const headers = {
+    'Accept-Ranges': 'bytes',
+    'Content-Type': 'audio/mpeg',
+    'ETag': etag,
+    'Last-Modified': stat.mtime.toUTCString(),
+    'Cache-Control': 'public, no-cache'
+  }
+
+  if (matchesIfNoneMatch(request, etag)) {
+    return handleCORS(new NextResponse(null, { status: 304, headers }))
+  }
+
+  // A stale If-Range validator means the client's partial copy is outdated
+  const rangeHeader = request.headers.get('range')
+  const ifRange = request.headers.get('if-range')
+  const range = rangeHeader && (!ifRange || ifRange === etag)
+    ? parseByteRange(rangeHeader, stat.size)
+    : undefined
+
+  if (range === null) {
+    return handleCORS(new NextResponse(null, {
+      status: 416,
+      headers: { ...headers, 'Content-Range': `bytes */${stat.size}` }
+    }))
   }
+
+  const { start, end } = range || { start: 0, end: stat.size - 1 }
+  const body = Readable.toWeb(createReadStream(filePath, { start, end }))
+
+  return handleCORS(new NextResponse(body, {
+    status: range ? 206 : 200,
+    headers: {
+      ...headers,
+      'Content-Length': String(end - start + 1),
+      ...(range && { 'Content-Range': `bytes ${start}-${end}/${stat.size}` })
+    }
+  }))
 }
 
-// Get current time block based on hour
-function getCurrentTimeBlock() {
-  const now = new Date()
-  const hour = now.getHours()
-  
-  for (const block of timeBlocks) {
-    if (block.start_hour <= block.end_hour) {
-      // Normal range (e.g., 8-12)
-      if (hour >= block.start_hour && hour < block.end_hour) {
-        return block.id
-      }
-    } else {
-      // Overnight range (e.g., late night 0-4)
-      if (hour >= block.start_hour || hour < block.end_hour) {
-        return block.id
+// Waveform peaks and loudness precomputed by scripts/analyze_audio.py, stored as
+// <content sha1>.wf files next to a manifest.json keyed by library path
+const ANALYSIS_DIR = process.env.ANALYSIS_DIR || path.join(process.cwd(), 'data', 'analysis')
+const WAVEFORM_MAGIC = 'SLWF'
+const WAVEFORM_HEADER_SIZE = 32
+
+let analysisManifest = { mtimeMs: 0, files: {} }
+
+// Re-read the manifest only when the analysis script has rewritten it
+async function getAnalysisFiles() {
+  const manifestPath = path.join(ANALYSIS_DIR, 'manifest.json')
+  let stat
+  try {
+    stat = await fs.stat(manifestPath)
+  } catch {
+    return {}
+  }
+  if (stat.mtimeMs !== analysisManifest.mtimeMs) {
+    const manifest = JSON.parse(await fs.readFile(manifestPath, 'utf8'))
+    analysisManifest = { mtimeMs: stat.mtimeMs, files: manifest.files || {} }
+  }
+  return analysisManifest.files
+}
+
+// Library path of a song: indexed songs carry file_path, seeded ones only an /api/audio/ URL
+function getSongFilePath(song) {
+  if (song.file_path) {
+    return song.file_path.split(path.sep).join('/')
+  }
+  if (song.url?.startsWith('/api/audio/')) {
+    return decodeURIComponent(song.url.slice('/api/audio/'.length))
+  }
+  return null
+}
+
+// See the format description in scripts/analyze_audio.py
+function decodeWaveform(buffer) {
+  if (buffer.length < WAVEFORM_HEADER_SIZE ||
+      buffer.toString('latin1', 0, 4) !== WAVEFORM_MAGIC ||
+      buffer.readUInt16LE(4) !== 1) {
+    throw new Error("Unsupported waveform file")
+  }
+
+  const points = buffer.readUInt32LE(12)
+  // -inf (digital silence) has no JSON representation
+  const decibels = value => Number.isFinite(value) ? Math.round(value * 100) / 100 : null
+  return {
+    sample_rate: buffer.readUInt32LE(8),
+    duration: Math.round(buffer.readFloatLE(16) * 1000) / 1000,
+    loudness_lufs: decibels(buffer.readFloatLE(20)),
+    peak_dbfs: decibels(buffer.readFloatLE(24)),
+    gain_db: decibels(buffer.readFloatLE(28)),
+    points,
+    // Interleaved (min, max) pairs of the mono mix, scaled to -127..127
+    peaks: Array.from(new Int8Array(buffer.buffer, buffer.byteOffset + WAVEFORM_HEADER_SIZE, points * 2))
+  }
+}
+
+const DEFAULT_PAGE_SIZE = 100
+const MAX_PAGE_SIZE = 1000
+
+// Pipe a Mongo cursor into an NDJSON response body one document at a time,
+// so the full result set is never held in memory
+function ndjsonStream(cursor) {
+  const encoder = new TextEncoder()
+  return new ReadableStream({
+    async pull(controller) {
+      try {
+        const doc = await cursor.next()
+        if (doc) {
+          controller.enqueue(encoder.encode(JSON.stringify(doc) + '\n'))
+        } else {
+          controller.close()
+          await cursor.close()
+        }
+      } catch (error) {
+        controller.error(error)
+        await cursor.close()
       }
+    },
+    async cancel() {
+      await cursor.close()
+    }
+  })
+}
+
+// GET /api/songs with query parameters: keyset pagination (`limit`, `after`),
+// `time_block`/`artist` filters and `format=ndjson` streaming
+async function querySongs(request, db, searchParams) {
+  const filter = {}
+  for (const field of ['time_block', 'artist']) {
+    if (searchParams.has(field)) {
+      filter[field] = searchParams.get(field)
+    }
+  }
+  if (searchParams.has('after')) {
+    filter.id = { $gt: searchParams.get('after') }
+  }
+
+  const streaming = searchParams.get('format') === 'ndjson' ||
+    (request.headers.get('accept') || '').includes('application/x-ndjson')
+
+  let limit = null
+  if (searchParams.has('limit') || !streaming) {
+    limit = Number(searchParams.get('limit') || DEFAULT_PAGE_SIZE)
+    if (!Number.isInteger(limit) || limit < 1 || limit > MAX_PAGE_SIZE) {
+      return handleCORS(NextResponse.json(
+        { error: `limit must be an integer between 1 and ${MAX_PAGE_SIZE}` },
+        { status: 400 }
+      ))
+    }
+  }
+
+  const cursor = db.collection('songs')
+    .find(filter, PUBLIC_FIELDS)
+    .sort({ id: 1 })
+
+  if (streaming) {
+    if (limit) {
+      cursor.limit(limit)
     }
+    return handleCORS(new NextResponse(ndjsonStream(cursor), {
+      status: 200,
+      headers: { 'Content-Type': 'application/x-ndjson' }
+    }))
   }
-  return 'early-morning' // fallback
+
+  // Fetch one extra row to learn whether another page exists
+  const songs = await timePhase('query', () => cursor.limit(limit + 1).toArray())
+  const hasMore = songs.length > limit
+  if (hasMore) {
+    songs.pop()
+  }
+
+  return cacheableJson(request, {
+    songs,
+    next_cursor: hasMore ? songs[songs.length - 1].id : null
+  })
 }
 
-// Route handler function
-async function handleRoute(request, { params }) {
-  const { path = [] } = params
-  const route = `/${path.join('/')}`
-  const method = request.method
+const SSE_HEARTBEAT_MS = 25000
+
+// Server-sent events for catalog changes: the current version on connect, then a
+// `catalog` event per change, with comment heartbeats so proxies keep the stream open
+function catalogEventStream(request) {
+  const encoder = new TextEncoder()
+  let unsubscribe
+  let heartbeat
+  let closed = false
+  // Returns false when already closed, e.g. the client went away (cancel) before the abort fired
+  const close = () => {
+    if (closed) return false
+    closed = true
+    unsubscribe?.()
+    clearInterval(heartbeat)
+    return true
+  }
+
+  const body = new ReadableStream({
+    start(controller) {
+      const write = text => controller.enqueue(encoder.encode(text))
+      const send = (event, data) => write(`event: ${event}\nid: ${data.version}\ndata: ${JSON.stringify(data)}\n\n`)
 
+      send('version', { version: getCatalogVersion() })
+      unsubscribe = subscribeToCatalog(change => send('catalog', change))
+      heartbeat = setInterval(() => write(': heartbeat\n\n'), SSE_HEARTBEAT_MS)
+      request.signal.addEventListener('abort', () => {
+        if (close()) controller.close()
+      })
+    },
+    cancel: close
+  })
+
+  return handleCORS(new NextResponse(body, {
+    status: 200,
+    headers: {
+      'Content-Type': 'text/event-stream',
+      'Cache-Control': 'no-cache, no-transform',
+      'Connection': 'keep-alive'
+    }
+  }))
+}
+
+// Collapse IDs out of routes so metric label cardinality stays bounded
+function routeLabel(route) {
+  if (route.startsWith('/audio/')) return '/audio/:file'
+  if (route.startsWith('/song/')) return '/song/:id/waveform'
+  if (route.startsWith('/playlist/')) {
+    return route.endsWith('/songs') ? '/playlist/:id/songs' : '/playlist/:id'
+  }
+  const known = [
+    '/', '/current-playlist', '/time-blocks', '/schedule', '/playlists', '/songs', '/metrics',
+    '/playlists/bulk', '/songs/bulk', '/catalog/events'
+  ]
+  return known.includes(route) ? route : 'other'
+}
+
+async function routeRequest(request, route, method) {
   try {
-    const db = await connectToMongo()
+    // Prometheus scrape endpoint
+    if (route === '/metrics' && method === 'GET') {
+      return handleCORS(new NextResponse(renderPrometheus(), {
+        status: 200,
+        headers: { 'Content-Type': 'text/plain; version=0.0.4; charset=utf-8' }
+      }))
+    }
+
+    // Audio is served straight from disk and never touches Mongo
+    if (route.startsWith('/audio/') && method === 'GET') {
+      return await serveAudio(request, route.slice('/audio/'.length))
+    }
+
+    const db = await timePhase('connect', connectToMongo)
     
-    // Initialize database on first request
-    await initializeDatabase()
+    // Seed the catalog on first request; later calls resolve immediately
+    await timePhase('init', initializeDatabase)
 
     // Root endpoint
     if (route === '/' && method === 'GET') {
+      const memory = process.memoryUsage()
       return handleCORS(NextResponse.json({ 
         message: "Salil Music Player API",
         version: "1.0.0",
         endpoints: [
           "GET /api/current-playlist",
+          "GET /api/time-blocks",
+          "GET /api/current-playlist?tz=&venue=",
+          "GET /api/schedule",
           "GET /api/playlist/:id", 
           "GET /api/playlists",
-          "GET /api/songs"
-        ]
+          "GET /api/songs",
+          "GET /api/songs?limit=&after=&time_block=&artist=&format=ndjson",
+          "GET /api/audio/:file",
+          "GET /api/song/:id/waveform",
+          "GET /api/metrics",
+          "GET /api/catalog/events",
+          "POST /api/playlists/bulk",
+          "POST /api/songs/bulk"
+        ],
+        catalog_version: getCatalogVersion(),
+        cache: getCacheStats(),
+        mongo: {
+          max_pool_size: poolOptions.maxPoolSize,
+          min_pool_size: poolOptions.minPoolSize
+        },
+        memory: {
+          rss: memory.rss,
+          heap_used: memory.heapUsed
+        }
       }))
     }
 
     // Get current playlist based on time
     if (route === '/current-playlist' && method === 'GET') {
-      const currentTimeBlock = getCurrentTimeBlock()
-      
-      const playlist = await db.collection('playlists')
-        .findOne({ time_block: currentTimeBlock })
-      
-      if (!playlist) {
+      const { searchParams } = new URL(request.url)
+      const result = await getCurrentPlaylist(db, {
+        venue: searchParams.get('venue'),
+        tz: searchParams.get('tz')
+      })
+      if (result.error) {
+        return handleCORS(NextResponse.json({ error: result.error }, { status: result.status }))
+      }
+
+      // Return the playlist with songs in the format expected by frontend
+      return cacheableJson(request, result.body)
+    }
+
+    // A venue's block configuration and which block is active in the given timezone
+    if (route === '/time-blocks' && method === 'GET') {
+      const { searchParams } = new URL(request.url)
+      const result = await getTimeBlocks(db, {
+        venue: searchParams.get('venue'),
+        tz: searchParams.get('tz')
+      })
+      if (result.error) {
+        return handleCORS(NextResponse.json({ error: result.error }, { status: result.status }))
+      }
+
+      return cacheableJson(request, result.body)
+    }
+
+    // Every playlist with its songs in one aggregation, so clients can switch
+    // time blocks without further requests
+    if (route === '/schedule' && method === 'GET') {
+      const schedule = await getSchedule(db)
+      return cacheableJson(request, schedule)
+    }
+
+    // Precomputed waveform and loudness for a song; 404 until it has been analysed.
+    // ?format=binary returns the stored .wf file as-is.
+    if (route.startsWith('/song/') && route.endsWith('/waveform') && method === 'GET') {
+      const songId = route.split('/')[2]
+
+      const song = await cachedRead(`song:${songId}`, async () => {
+        return db.collection('songs').findOne({ id: songId }, PUBLIC_FIELDS)
+      }, { cacheEmpty: false })
+
+      if (!song) {
+        return handleCORS(NextResponse.json({ error: "Song not found" }, { status: 404 }))
+      }
+
+      const entry = (await getAnalysisFiles())[getSongFilePath(song)]
+      let buffer
+      try {
+        buffer = entry && await fs.readFile(path.join(ANALYSIS_DIR, `${entry.content_hash}.wf`))
+      } catch {
+        buffer = null
+      }
+      if (!buffer) {
         return handleCORS(NextResponse.json(
-          { error: "No playlist found for current time" }, 
+          { error: "Song has not been analysed yet" },
           { status: 404 }
         ))
       }
 
-      // Get songs for this playlist
-      const songs = await db.collection('songs')
-        .find({ playlist_id: playlist.id })
-        .toArray()
-
-      const cleanedSongs = songs.map(({ _id, ...rest }) => rest)
+      const { searchParams } = new URL(request.url)
+      if (searchParams.get('format') === 'binary') {
+        const headers = {
+          'Content-Type': 'application/octet-stream',
+          'ETag': `"${entry.content_hash}"`,
+          'Cache-Control': 'no-cache'
+        }
+        if (matchesIfNoneMatch(request, headers.ETag)) {
+          return handleCORS(new NextResponse(null, { status: 304, headers }))
+        }
+        return handleCORS(new NextResponse(buffer, { status: 200, headers }))
+      }
 
-      // Return the playlist with songs in the format expected by frontend
-      return handleCORS(NextResponse.json({
-        playlist: { ...playlist, _id: undefined },
-        songs: cleanedSongs,
-        current_time_block: currentTimeBlock
-      }))
+      return cacheableJson(request, {
+        song_id: songId,
+        content_hash: entry.content_hash,
+        ...decodeWaveform(buffer)
+      })
     }
 
     // Get songs by playlist (must come before general playlist route)
     if (route.startsWith('/playlist/') && route.endsWith('/songs') && method === 'GET') {
       const playlistId = route.split('/')[2]
       
-      const songs = await db.collection('songs')
-        .find({ playlist_id: playlistId })
-        .toArray()
-
-      const cleanedSongs = songs.map(({ _id, ...rest }) => rest)
+      const playlistSongs = await cachedRead(`playlist-songs:${playlistId}`, async () => {
+        const songs = await db.collection('songs')
+          .find({ playlist_id: playlistId }, PUBLIC_FIELDS)
+          .sort({ position: 1 })
+          .toArray()
+        return songs.length ? songs : null
+      }, { cacheEmpty: false })
       
-      return handleCORS(NextResponse.json(cleanedSongs))
+      return cacheableJson(request, playlistSongs || [])
     }
 
     // Get specific playlist by ID
     if (route.startsWith('/playlist/') && method === 'GET') {
       const playlistId = route.split('/')[2]
       
-      const playlist = await db.collection('playlists')
-        .findOne({ id: playlistId })
+      const data = await cachedRead(`playlist:${playlistId}`, async () => {
+        const playlist = await db.collection('playlists')
+          .findOne({ id: playlistId }, PUBLIC_FIELDS)
+        if (!playlist) {
+          return null
+        }
+
+        const songs = await db.collection('songs')
+          .find({ playlist_id: playlistId }, PUBLIC_FIELDS)
+          .sort({ position: 1 })
+          .toArray()
+
+        return { playlist, songs }
+      }, { cacheEmpty: false })
       
-      if (!playlist) {
+      if (!data) {
         return handleCORS(NextResponse.json(
           { error: "Playlist not found" }, 
           { status: 404 }
         ))
       }
 
-      const songs = await db.collection('songs')
-        .find({ playlist_id: playlistId })
-        .toArray()
-
-      const cleanedSongs = songs.map(({ _id, ...rest }) => rest)
-
-      return handleCORS(NextResponse.json({
-        playlist: { ...playlist, _id: undefined },
-        songs: cleanedSongs
-      }))
+      return cacheableJson(request, data)
     }
 
     // Get all playlists
     if (route === '/playlists' && method === 'GET') {
-      const playlists = await db.collection('playlists')
-        .find({})
-        .toArray()
-
-      const cleanedPlaylists = playlists.map(({ _id, ...rest }) => rest)
+      const playlists = await cachedRead('playlists', async () => {
+        return db.collection('playlists')
+          .find({}, PUBLIC_FIELDS)
+          .sort(PLAYLIST_ORDER)
+          .toArray()
+      })
       
-      return handleCORS(NextResponse.json(cleanedPlaylists))
+      return cacheableJson(request, playlists)
     }
 
     // Get all songs
     if (route === '/songs' && method === 'GET') {
-      const songs = await db.collection('songs')
-        .find({})
-        .toArray()
+      // Any query parameter switches to the paginated/filtered/streaming form
+      const { searchParams } = new URL(request.url)
+      if ([...searchParams.keys()].length) {
+        return await querySongs(request, db, searchParams)
+      }
 
-      const cleanedSongs = songs.map(({ _id, ...rest }) => rest)
-      
-      return handleCORS(NextResponse.json(cleanedSongs))
+      // The legacy bare form keeps its plain-array body but is capped at one
+      // maximum-size page, with a Link header to continue through the paginated form
+      const songs = await cachedRead('songs', async () => {
+        return db.collection('songs')
+          .find({}, PUBLIC_FIELDS)
+          .sort({ id: 1 })
+          .limit(MAX_PAGE_SIZE + 1)
+          .toArray()
+      })
+
+      const hasMore = songs.length > MAX_PAGE_SIZE
+      const page = hasMore ? songs.slice(0, MAX_PAGE_SIZE) : songs
+      const response = cacheableJson(request, page)
+      if (hasMore) {
+        const next = `/api/songs?limit=${MAX_PAGE_SIZE}&after=${encodeURIComponent(page[page.length - 1].id)}`
+        response.headers.set('Link', `<${next}>; rel="next"`)
+      }
+      return response
+    }
+
+    // Catalog change feed for connected players
+    if (route === '/catalog/events' && method === 'GET') {
+      return catalogEventStream(request)
+    }
+
+    // Bulk create/reorder/delete; each request is one bulkWrite and one catalog version
+    if (WRITE_ROUTES.includes(route) && method === 'POST') {
+      const rejected = rejectCatalogWrite(request)
+      if (rejected) {
+        return rejected
+      }
+
+      let body
+      try {
+        body = await request.json()
+      } catch {
+        return NextResponse.json({ error: "Invalid JSON body" }, { status: 400 })
+      }
+
+      const apply = route === '/playlists/bulk' ? bulkPlaylists : bulkSongs
+      const { status, ...result } = await timePhase('query', () => apply(db, body))
+      return NextResponse.json(result, { status: status || 200 })
     }
 
     // Route not found
@@ -294,13 +664,29 @@ async function handleRoute(request, { params }) {
 
   } catch (error) {
     console.error('API Error:', error)
-    return handleCORS(NextResponse.json(
+    const response = NextResponse.json(
       { error: "Internal server error", details: error.message }, 
       { status: 500 }
-    ))
+    )
+    return WRITE_ROUTES.includes(route) ? response : handleCORS(response)
   }
 }
 
+// Route handler function
+async function handleRoute(request, { params }) {
+  const { path = [] } = params
+  const route = `/${path.join('/')}`
+  const method = request.method
+
+  const { response, timer } = await withRequestMetrics(routeLabel(route), method, () =>
+    routeRequest(request, route, method)
+  )
+  if (process.env.SERVER_TIMING === 'true') {
+    response.headers.set('Server-Timing', timer.serverTiming())
+  }
+  return response
+}
+
 // Export all HTTP methods
 export const GET = handleRoute
 export const POST = handleRoute
@@ -0,0 +1,676 @@
+'use client'
+
+import { useState, useEffect, useRef } from 'react'
+import { Play, Pause, SkipForward, SkipBack, Volume2 } from 'lucide-react'
+import { Button } from '@/components/ui/button'
+import { Card } from '@/components/ui/card'
+import { Slider } from '@/components/ui/slider'
+import { Waveform } from '@/components/waveform'
+import { PlaybackEngine } from '@/lib/playback-engine'
+
+// Dial colours for the default blocks; a venue's own blocks take colours from the palette
+const BLOCK_COLORS = {
+  'early-morning': '#FFE4B5',
+  'morning': '#FFD700',
+  'afternoon': '#FF8C00',
+  'evening': '#FF6347',
+  'night': '#4B0082',
+  'late-night': '#191970'
+}
+const PALETTE = ['#FFE4B5', '#FFD700', '#FF8C00', '#FF6347', '#4B0082', '#191970', '#2E8B57', '#4682B4']
+
+// '16:00' -> { hour: '4', period: 'PM' }, keeping minutes only when set
+const formatClock = (value) => {
+  const [hours, minutes] = value.split(':').map(Number)
+  const hour = `${hours % 12 || 12}${minutes ? `:${String(minutes).padStart(2, '0')}` : ''}`
+  return { hour, period: hours % 24 < 12 ? 'AM' : 'PM' }
+}
+
+// '04:00'-'08:00' -> '4-8 AM', '08:00'-'12:00' -> '8 AM-12 PM'
+const formatBlockTime = (start, end) => {
+  const from = formatClock(start)
+  const to = formatClock(end)
+  return from.period === to.period
+    ? `${from.hour}-${to.hour} ${to.period}`
+    : `${from.hour} ${from.period}-${to.hour} ${to.period}`
+}
+
+// Shown when the venue has nothing scheduled right now
+const NO_BLOCK = { id: null, name: 'Nothing scheduled', time: '' }
+
+// Storage budget for the service worker's offline audio cache
+const OFFLINE_CACHE_MB = Number(process.env.NEXT_PUBLIC_OFFLINE_CACHE_MB || 200)
+
+// Optional overlap between consecutive tracks; 0 keeps transitions strictly gapless
+const CROSSFADE_SECONDS = Number(process.env.NEXT_PUBLIC_CROSSFADE_SECONDS || 0)
+
+// Retry backoff while the current playlist we get is already out of date
+const STALE_RETRY_MIN_MS = 5 * 1000
+const STALE_RETRY_MAX_MS = 60 * 1000
+
+// The page resolves the current block's playlist, the venue's time blocks and the
+// whole schedule while rendering on the server and passes them in, so playback can
+// start right after hydration; without them everything is fetched from the API on
+// mount. `venue` and `timeZone` are only sent when configured, so the server uses
+// the default venue and the venue's own timezone otherwise.
+const SalilMusicPlayer = ({
+  venue = null,
+  timeZone = null,
+  initialPlaylist = null,
+  initialTimeBlocks = null,
+  initialSchedule = null
+}) => {
+  const [currentTime, setCurrentTime] = useState(new Date())
+  const [isPlaying, setIsPlaying] = useState(false)
+  const [currentSong, setCurrentSong] = useState(0)
+  const [volume, setVolume] = useState(75)
+  const [currentPlaylist, setCurrentPlaylist] = useState(
+    initialPlaylist && { name: initialPlaylist.playlist.name, songs: initialPlaylist.songs }
+  )
+  const [selectedTimeBlock, setSelectedTimeBlock] = useState(null)
+  const [schedule, setSchedule] = useState(initialSchedule)
+  // The venue's block configuration from /api/time-blocks, drawn as the dial
+  const [venueBlocks, setVenueBlocks] = useState(initialTimeBlocks?.time_blocks ?? null)
+  // Latest schedule for the fetch effect, which outlives individual renders
+  const scheduleRef = useRef(initialSchedule)
+  // Live and upcoming block IDs as resolved by the server for this venue
+  const [liveBlocks, setLiveBlocks] = useState({
+    current: initialPlaylist?.current_time_block ?? null,
+    next: initialPlaylist?.next_time_block ?? null
+  })
+  // Server-rendered current playlist, consumed by the first run of the fetch effect
+  const initialPlaylistRef = useRef(initialPlaylist)
+  // Re-fetches the live playlist now (used on catalog changes); set by the fetch effect
+  const refreshCurrentRef = useRef(null)
+  const engineRef = useRef(null)
+  // Playlist handed to the engine but not yet audible (e.g. during a block rollover)
+  const pendingPlaylistRef = useRef(null)
+  // Waveform/loudness analysis per song ID (promises, null when not analysed)
+  const analysesRef = useRef(new Map())
+  const [waveform, setWaveform] = useState(null)
+
+  const fetchAnalysis = (song) => {
+    const analyses = analysesRef.current
+    if (!analyses.has(song.id)) {
+      analyses.set(song.id, fetch(`/api/song/${song.id}/waveform`)
+        .then(response => (response.ok ? response.json() : null))
+        .catch(() => null))
+    }
+    return analyses.get(song.id)
+  }
+
+  // Gapless playback engine; it reports which track is audible via onTrackChange
+  useEffect(() => {
+    const engine = new PlaybackEngine({
+      crossfade: CROSSFADE_SECONDS,
+      // Level every track to the analysis target loudness
+      getGain: song => fetchAnalysis(song).then(analysis => analysis?.gain_db ?? 0),
+      onTrackChange: (index, queue) => {
+        const pending = pendingPlaylistRef.current
+        if (pending && pending.songs === queue) {
+          pendingPlaylistRef.current = null
+          setCurrentPlaylist(pending)
+        }
+        setCurrentSong(index)
+      },
+      onError: error => console.error('Error playing audio:', error),
+      // No track would load; show the player as stopped rather than playing silence
+      onStop: () => setIsPlaying(false)
+    })
+    engineRef.current = engine
+    return () => engine.destroy()
+  }, [])
+
+  // Queue a playlist on the engine, starting at `index`. With immediate: false the
+  // playing track finishes first and the new playlist follows without a gap.
+  const loadPlaylist = (playlist, { index = 0, ...options } = {}) => {
+    pendingPlaylistRef.current = playlist
+    engineRef.current?.setQueue(playlist.songs, index, options)
+  }
+
+  // Update current time every second
+  useEffect(() => {
+    const timer = setInterval(() => {
+      setCurrentTime(new Date())
+    }, 1000)
+    return () => clearInterval(timer)
+  }, [])
+
+  // Query string selecting the venue and timezone, for the block-resolving endpoints
+  const locationParams = new URLSearchParams(Object.entries({ venue, tz: timeZone }).filter(([, value]) => value)).toString()
+  const locationQuery = locationParams ? `?${locationParams}` : ''
+
+  // Fetch the current playlist once, then refetch only when the time block changes
+  useEffect(() => {
+    if (selectedTimeBlock) return
+
+    let cancelled = false
+    let refetchTimer
+    let firstFetch = true
+    let staleRetryDelay = STALE_RETRY_MIN_MS
+    // Block switched to from the cached schedule while only stale data is available
+    let offlineBlock = null
+    // The live playlist as last queued, to skip refetches that change nothing
+    let live = null
+
+    // Queue the live playlist if its contents changed. Block rollovers let the
+    // current track play out and start the new playlist from the top; an edit to
+    // the playlist that is playing continues after the audible song, found by ID.
+    // The initial load switches at once.
+    const queueLive = (playlist, songs) => {
+      const signature = JSON.stringify([playlist.id, playlist.name, songs])
+      if (live?.signature === signature) return
+
+      let index = 0
+      const engine = engineRef.current
+      const audible = engine?.queue[engine.index]
+      if (!firstFetch && audible && live?.id === playlist.id && songs.length) {
+        const position = songs.findIndex(song => song.id === audible.id)
+        // A deleted song is followed by whatever now holds its place
+        index = position === -1 ? engine.index % songs.length : (position + 1) % songs.length
+      }
+
+      loadPlaylist({ name: playlist.name, songs }, { immediate: firstFetch, index })
+      live = { id: playlist.id, signature }
+      firstFetch = false
+    }
+
+    // Follow the block after an expired one using the cached schedule, whose audio
+    // the service worker precached for exactly this case; once per block
+    const advanceOffline = (blockId) => {
+      if (!blockId || blockId === offlineBlock) return
+      const entry = scheduleRef.current?.find(item => item.playlist.time_block === blockId)
+      if (!entry) return
+      offlineBlock = blockId
+      queueLive(entry.playlist, entry.songs)
+      setLiveBlocks({ current: blockId, next: null })
+    }
+
+    const applyCurrentPlaylist = (data) => {
+      // A copy whose block is already over, e.g. the service worker's offline
+      // fallback after a boundary: don't requeue it, and back off instead of
+      // asking again every second for the whole outage
+      if (data?.next_change_at && new Date(data.next_change_at) <= Date.now()) {
+        advanceOffline(data.next_time_block)
+        refetchTimer = setTimeout(fetchCurrentPlaylist, staleRetryDelay)
+        staleRetryDelay = Math.min(staleRetryDelay * 2, STALE_RETRY_MAX_MS)
+        return
+      }
+      staleRetryDelay = STALE_RETRY_MIN_MS
+      offlineBlock = null
+
+      if (data && data.playlist && data.songs) {
+        queueLive(data.playlist, data.songs)
+      }
+      if (data?.current_time_block) {
+        setLiveBlocks({ current: data.current_time_block, next: data.next_time_block })
+      }
+      // The server picked the block, so its boundary decides when to ask again; a second
+      // of slack keeps us from landing just before the switch on a slightly fast clock
+      if (!data?.next_change_at) throw new Error(data?.error || 'Missing next_change_at')
+      const nextChange = new Date(data.next_change_at)
+      refetchTimer = setTimeout(fetchCurrentPlaylist, Math.max(nextChange - Date.now(), 0) + 1000)
+    }
+
+    const fetchCurrentPlaylist = async () => {
+      try {
+        const response = await fetch(`/api/current-playlist${locationQuery}`, { cache: 'no-cache' })
+        const data = await response.json()
+        if (cancelled) return
+        applyCurrentPlaylist(data)
+      } catch (error) {
+        console.error('Failed to fetch current playlist:', error)
+        if (!cancelled) refetchTimer = setTimeout(fetchCurrentPlaylist, 60 * 1000)
+      }
+    }
+
+    // The server resolved it for the same venue and timezone we would ask for
+    const initial = initialPlaylistRef.current
+    initialPlaylistRef.current = null
+    if (initial) {
+      applyCurrentPlaylist(initial)
+    } else {
+      fetchCurrentPlaylist()
+    }
+    refreshCurrentRef.current = () => {
+      clearTimeout(refetchTimer)
+      fetchCurrentPlaylist()
+    }
+    return () => {
+      cancelled = true
+      clearTimeout(refetchTimer)
+      refreshCurrentRef.current = null
+    }
+  }, [selectedTimeBlock, locationQuery])
+
+  const fetchSchedule = async () => {
+    try {
+      const response = await fetch('/api/schedule', { cache: 'no-cache' })
+      const data = await response.json()
+      if (Array.isArray(data)) {
+        setSchedule(data)
+      }
+    } catch (error) {
+      console.error('Failed to fetch schedule:', error)
+    }
+  }
+
+  useEffect(() => {
+    scheduleRef.current = schedule
+  }, [schedule])
+
+  const fetchTimeBlocks = async () => {
+    try {
+      const response = await fetch(`/api/time-blocks${locationQuery}`, { cache: 'no-cache' })
+      const data = await response.json()
+      if (Array.isArray(data.time_blocks)) {
+        setVenueBlocks(data.time_blocks)
+      }
+    } catch (error) {
+      console.error('Failed to fetch time blocks:', error)
+    }
+  }
+
+  useEffect(() => {
+    if (initialTimeBlocks) return
+    fetchTimeBlocks()
+  }, [])
+
+  // Prefetch every block's playlist and songs so dial clicks need no network calls
+  useEffect(() => {
+    if (initialSchedule) return
+    fetchSchedule()
+  }, [])
+
+  // Catalog change feed: when the catalog is edited, reload the schedule and the
+  // live playlist (which takes over once the current track ends) instead of polling.
+  // Catalog reads are fetched with cache: 'no-cache', so they revalidate (a cheap
+  // 304 when unchanged) rather than coming from an HTTP cache that predates the edit.
+  useEffect(() => {
+    if (typeof EventSource === 'undefined') return
+
+    let knownVersion = null
+    const source = new EventSource('/api/catalog/events')
+    // `version` arrives on every (re)connect, `catalog` on each change
+    const onVersion = (event) => {
+      const { version } = JSON.parse(event.data)
+      if (knownVersion !== null && version > knownVersion) {
+        fetchSchedule()
+        fetchTimeBlocks()
+        refreshCurrentRef.current?.()
+      }
+      knownVersion = Math.max(knownVersion ?? version, version)
+    }
+    source.addEventListener('version', onVersion)
+    source.addEventListener('catalog', onVersion)
+    return () => source.close()
+  }, [])
+
+  // Register the offline cache service worker
+  useEffect(() => {
+    if (!('serviceWorker' in navigator)) return
+    navigator.serviceWorker
+      .register(`/sw.js?budget=${OFFLINE_CACHE_MB}`)
+      .catch(error => console.error('Service worker registration failed:', error))
+  }, [])
+
+  // Keep the current and next block's audio cached offline; re-runs only when the block changes
+  useEffect(() => {
+    if (!schedule || !liveBlocks.current || !('serviceWorker' in navigator)) return
+
+    const urls = schedule
+      .filter(entry => entry.playlist.time_block === liveBlocks.current || entry.playlist.time_block === liveBlocks.next)
+      .flatMap(entry => entry.songs.map(song => song.url))
+
+    navigator.serviceWorker.ready
+      .then(registration => registration.active?.postMessage({ type: 'precache', urls }))
+      .catch(error => console.error('Failed to precache audio:', error))
+  }, [schedule, liveBlocks])
+
+  // Waveform of the audible song
+  const playingSong = currentPlaylist?.songs?.[currentSong]
+  useEffect(() => {
+    setWaveform(null)
+    if (!playingSong) return
+
+    let cancelled = false
+    fetchAnalysis(playingSong).then(analysis => {
+      if (!cancelled) setWaveform(analysis)
+    })
+    return () => {
+      cancelled = true
+    }
+  }, [playingSong])
+
+  // This effect handles playing/pausing when the isPlaying state changes
+  useEffect(() => {
+    if (isPlaying) {
+      engineRef.current?.play()
+    } else {
+      engineRef.current?.pause()
+    }
+  }, [isPlaying])
+
+  // This effect handles volume changes
+  useEffect(() => {
+    engineRef.current?.setVolume(volume / 100)
+  }, [volume])
+
+  // Switch to a time block, from the prefetched schedule when it has loaded. Both
+  // lists come in the server's playlist order, so the first match is the same
+  // playlist /api/current-playlist plays for that block.
+  const selectTimeBlock = async (block) => {
+    setSelectedTimeBlock(block)
+    try {
+      const entry = schedule?.find(item => item.playlist.time_block === block.id)
+      setIsPlaying(false)
+      engineRef.current?.pause()
+      if (entry) {
+        loadPlaylist({ name: entry.playlist.name, songs: entry.songs })
+      } else {
+        const playlistsRes = await fetch('/api/playlists')
+        const playlists = await playlistsRes.json()
+        const match = Array.isArray(playlists)
+          ? playlists.find(p => p.time_block === block.id)
+          : null
+        if (match) {
+          const songsRes = await fetch(`/api/playlist/${match.id}/songs`)
+          const songs = await songsRes.json()
+          loadPlaylist({ name: match.name, songs })
+        }
+      }
+    } catch (error) {
+      console.error(`Failed to fetch playlist for ${block.name}:`, error)
+    }
+  }
+
+  const resetToCurrentTime = () => {
+    setSelectedTimeBlock(null)
+    setCurrentSong(0)
+    // The fetchCurrentPlaylist useEffect will automatically fetch the current playlist
+  }
+
+  // Start/stop the engine inside the click handler so the AudioContext may resume
+  const togglePlayPause = () => {
+    if (isPlaying) {
+      engineRef.current?.pause()
+    } else {
+      engineRef.current?.play()
+    }
+    setIsPlaying(!isPlaying)
+  }
+
+  const nextSong = () => {
+    engineRef.current?.next()
+  }
+
+  const prevSong = () => {
+    engineRef.current?.previous()
+  }
+
+  // Dial entries for the venue's blocks, with display times and colours
+  const dialBlocks = (venueBlocks || []).map((block, index) => ({
+    ...block,
+    time: formatBlockTime(block.start, block.end),
+    color: BLOCK_COLORS[block.id] || PALETTE[index % PALETTE.length]
+  }))
+
+  const createTimeDialPath = () => {
+    const centerX = 300
+    const centerY = 300
+    const radius = 200
+    const segmentAngle = 360 / dialBlocks.length
+
+    return dialBlocks.map((block, index) => {
+      const startAngle = (index * segmentAngle - 90) * (Math.PI / 180)
+      const endAngle = ((index + 1) * segmentAngle - 90) * (Math.PI / 180)
+
+      const x1 = centerX + radius * Math.cos(startAngle)
+      const y1 = centerY + radius * Math.sin(startAngle)
+      const x2 = centerX + radius * Math.cos(endAngle)
+      const y2 = centerY + radius * Math.sin(endAngle)
+
+      const largeArcFlag = segmentAngle > 180 ? 1 : 0
+
+      return {
+        ...block,
+        path: `M ${centerX} ${centerY} L ${x1} ${y1} A ${radius} ${radius} 0 ${largeArcFlag} 1 ${x2} ${y2} Z`,
+        textX: centerX + (radius * 0.7) * Math.cos((startAngle + endAngle) / 2),
+        textY: centerY + (radius * 0.7) * Math.sin((startAngle + endAngle) / 2),
+      }
+    })
+  }
+
+  const formatTime = (date) => {
+    return date.toLocaleTimeString('en-US', { 
+      hour: '2-digit', 
+      minute: '2-digit',
+      hour12: true 
+    })
+  }
+
+  const getActiveTimeBlock = () => {
+    return selectedTimeBlock || dialBlocks.find(block => block.id === liveBlocks.current) || NO_BLOCK
+  }
+
+  // Re-read on every render; the clock re-renders the page each second
+  const getProgress = () => {
+    const { elapsed, duration } = engineRef.current?.position() || { elapsed: 0, duration: 0 }
+    return duration ? elapsed / duration : 0
+  }
+
+  const activeBlock = getActiveTimeBlock()
+  const dialSegments = createTimeDialPath()
+
+  return (
+    <div className="min-h-screen bg-gradient-to-br from-orange-300 via-pink-300 to-purple-400 flex flex-col items-center justify-center p-4">
+      {/* Header */}
+      <div className="text-center mb-8">
+        <h1 className="text-4xl md:text-6xl font-bold text-white mb-4 tracking-wide">
+          Salil Music Player
+        </h1>
+        <div className="text-xl md:text-2xl text-white/90 font-medium">
+          {formatTime(currentTime)}
+        </div>
+      </div>
+
+      {/* Circular Time Dial */}
+      <div className="relative mb-8">
+        <svg width="600" height="600" className="filter drop-shadow-2xl">
+          {/* Outer glow */}
+          <defs>
+            <filter id="glow">
+              <feGaussianBlur stdDeviation="3" result="coloredBlur"/>
+              <feMerge>
+                <feMergeNode in="coloredBlur"/>
+                <feMergeNode in="SourceGraphic"/>
+              </feMerge>
+            </filter>
+          </defs>
+
+          {/* Time segments */}
+          {dialSegments.map((segment, index) => {
+            const isActive = segment.id === activeBlock.id
+            return (
+              <g key={`${segment.id}-${index}`}>
+                <path
+                  d={segment.path}
+                  fill={isActive ? segment.color : `${segment.color}80`}
+                  stroke="rgba(255, 255, 255, 0.3)"
+                  strokeWidth="2"
+                  className={`cursor-pointer transition-all duration-300 ${isActive ? 'filter-[url(#glow)]' : 'hover:opacity-80'}`}
+                  onClick={() => selectTimeBlock(segment)}
+                />
+                <text
+                  x={segment.textX}
+                  y={segment.textY}
+                  textAnchor="middle"
+                  className="fill-white text-sm font-medium pointer-events-none"
+                  style={{ fontSize: '12px' }}
+                >
+                  {segment.name.split(' ')[0]}
+                </text>
+                <text
+                  x={segment.textX}
+                  y={segment.textY + 12}
+                  textAnchor="middle"
+                  className="fill-white text-xs opacity-80 pointer-events-none"
+                  style={{ fontSize: '10px' }}
+                >
+                  {segment.time}
+                </text>
+              </g>
+            )
+          })}
+
+          {/* Center play button */}
+          <circle
+            cx="300"
+            cy="300"
+            r="80"
+            fill="rgba(255, 255, 255, 0.9)"
+            className="cursor-pointer hover:fill-white transition-all duration-300 filter drop-shadow-lg"
+            onClick={togglePlayPause}
+          />
+
+          {/* Play/Pause icon */}
+          {isPlaying ? (
+            <rect
+              x="285"
+              y="275"
+              width="30"
+              height="50"
+              fill="rgba(0, 0, 0, 0.8)"
+              className="pointer-events-none"
+            />
+          ) : (
+            <polygon
+              points="285,275 285,325 335,300"
+              fill="rgba(0, 0, 0, 0.8)"
+              className="pointer-events-none"
+            />
+          )}
+        </svg>
+
+        {/* Current time block label */}
+        <div className="absolute top-4 left-1/2 transform -translate-x-1/2">
+          <div className="bg-white/20 backdrop-blur-md rounded-full px-6 py-2">
+            <div className="text-white text-center">
+              <div className="font-semibold">{activeBlock.name}</div>
+              <div className="text-sm opacity-80">{activeBlock.time}</div>
+            </div>
+          </div>
+        </div>
+      </div>
+
+      {/* Current Playlist Info */}
+      {currentPlaylist && (
+        <Card className="bg-white/10 backdrop-blur-md border-white/20 text-white p-6 mb-6 max-w-md w-full">
+          <div className="text-center">
+            <h3 className="text-xl font-semibold mb-2">{currentPlaylist.name}</h3>
+            {currentPlaylist?.songs?.[currentSong] && (
+              <div className="space-y-1">
+                <div className="font-medium">{currentPlaylist.songs[currentSong].title}</div>
+                <div className="text-sm opacity-80">by {currentPlaylist.songs[currentSong].artist}</div>
+                {waveform && (
+                  <Waveform
+                    peaks={waveform.peaks}
+                    progress={getProgress()}
+                    className="w-full h-12 mt-3"
+                  />
+                )}
+              </div>
+            )}
+          </div>
+        </Card>
+      )}
+
+      {/* Audio Controls */}
+      <Card className="bg-white/10 backdrop-blur-md border-white/20 text-white p-6 max-w-md w-full">
+        <div className="flex items-center justify-center space-x-4 mb-4">
+          <Button
+            variant="ghost"
+            size="sm"
+            onClick={prevSong}
+            className="text-white hover:bg-white/20"
+          >
+            <SkipBack size={20} />
+          </Button>
+
+          <Button
+            variant="ghost"
+            size="lg"
+            onClick={togglePlayPause}
+            className="text-white hover:bg-white/20 rounded-full w-12 h-12"
+          >
+            {isPlaying ? <Pause size={24} /> : <Play size={24} />}
+          </Button>
+
+          <Button
+            variant="ghost"
+            size="sm"
+            onClick={nextSong}
+            className="text-white hover:bg-white/20"
+          >
+            <SkipForward size={20} />
+          </Button>
+        </div>
+
+        {/* Volume Control */}
+        <div className="flex items-center space-x-2">
+          <Volume2 size={16} />
+          <Slider
+            value={[volume]}
+            onValueChange={(value) => setVolume(value[0])}
+            max={100}
+            step={1}
+            className="flex-1"
+          />
+          <span className="text-sm w-8">{volume}</span>
+        </div>
+
+        {/* Reset to current time button */}
+        {selectedTimeBlock && (
+          <div className="mt-4 text-center">
+            <Button
+              variant="outline"
+              size="sm"
+              onClick={resetToCurrentTime}
+              className="text-white border-white/30 hover:bg-white/20"
+            >
+              Back to Current Time
+            </Button>
+          </div>
+        )}
+      </Card>
+
+      {/* Current Playlist Songs */}
+      {currentPlaylist && (
+        <Card className="bg-white/10 backdrop-blur-md border-white/20 text-white p-4 mt-4 max-w-md w-full">
+          <h4 className="font-medium mb-3 text-center">Playlist</h4>
+          <div className="space-y-2 max-h-40 overflow-y-auto">
+            {currentPlaylist?.songs?.map((song, index) => (
+              <div
+                key={song.id}
+                className={`flex items-center justify-between p-2 rounded cursor-pointer transition-colors ${
+                  index === currentSong ? 'bg-white/20' : 'hover:bg-white/10'
+                }`}
+                onClick={() => engineRef.current?.jumpTo(index)}
+              >
+                <div>
+                  <div className="text-sm font-medium">{song.title}</div>
+                  <div className="text-xs opacity-70">{song.artist}</div>
+                </div>
+                {index === currentSong && isPlaying && (
+                  <div className="text-xs">♪</div>
+                )}
+              </div>
+            ))}
+          </div>
+        </Card>
+      )}
+    </div>
+  )
+}
+
+export default SalilMusicPlayer
@@ -0,0 +1,45 @@
+'use client'
+
+// Number of bars drawn, whatever resolution the analysis was stored at
+const BARS = 120
+
+// Track overview from /api/song/:id/waveform with the played part highlighted.
+// `peaks` are interleaved (min, max) pairs in -127..127; `progress` is 0..1.
+export function Waveform({ peaks, progress = 0, className = '' }) {
+  if (!peaks?.length) return null
+
+  const points = peaks.length / 2
+  const step = Math.max(1, Math.ceil(points / BARS))
+  const bars = []
+  for (let start = 0; start < points; start += step) {
+    let min = 0
+    let max = 0
+    for (let i = start; i < Math.min(start + step, points); i++) {
+      min = Math.min(min, peaks[2 * i])
+      max = Math.max(max, peaks[2 * i + 1])
+    }
+    bars.push({ min, max })
+  }
+
+  const played = progress * bars.length
+  return (
+    <svg
+      viewBox={`0 0 ${bars.length} 256`}
+      preserveAspectRatio="none"
+      className={className}
+      role="img"
+      aria-label="Track waveform"
+    >
+      {bars.map(({ min, max }, index) => (
+        <rect
+          key={index}
+          x={index + 0.15}
+          y={128 - Math.max(max, 1)}
+          width={0.7}
+          height={Math.max(max - min, 2)}
+          fill={index < played ? 'rgba(255, 255, 255, 0.95)' : 'rgba(255, 255, 255, 0.35)'}
+        />
+      ))}
+    </svg>
+  )
+}
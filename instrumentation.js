@@ -0,0 +1,16 @@
+// Runs once when the server starts. Opening the Mongo pool and seeding here means
+// the first request (page render or API call) finds minPoolSize connections ready
+// and the catalog initialised, instead of paying for both itself.
+export async function register() {
+  if (process.env.NEXT_RUNTIME !== 'nodejs') return
+
+  const { initializeDatabase } = await import('@/lib/catalog')
+  const { connectToMongo } = await import('@/lib/mongo')
+  try {
+    await connectToMongo()
+    await initializeDatabase()
+  } catch (error) {
+    // Not fatal: requests retry the connect on demand
+    console.error('Mongo warm-up failed:', error)
+  }
+}
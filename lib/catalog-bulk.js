@@ -0,0 +1,207 @@
+import { v4 as uuidv4 } from 'uuid'
+import { publishCatalogChange } from '@/lib/catalog'
+
+// Bulk catalog mutations behind POST /api/playlists/bulk and POST /api/songs/bulk.
+// Every operation in a request goes to Mongo as one unordered bulkWrite per
+// collection; the catalog version is then bumped once for the whole request,
+// also when a write fails part-way (see publishAfter).
+//
+// Both return { error, status } for invalid input, otherwise the response body.
+
+export const MAX_BULK_OPERATIONS = 50000
+
+const PLAYLIST_FIELDS = ['name', 'time_block', 'start_time', 'end_time']
+const SONG_FIELDS = ['title', 'artist', 'url']
+
+function isNonEmptyString(value) {
+  return typeof value === 'string' && value.trim() !== ''
+}
+
+function isStringArray(value) {
+  return Array.isArray(value) && value.every(isNonEmptyString)
+}
+
+// Shared shape checks; returns an error message or null
+function validateEnvelope(body, reorderShape) {
+  if (!body || typeof body !== 'object' || Array.isArray(body)) {
+    return "Body must be an object with create, reorder and/or delete"
+  }
+  const { create = [], reorder = [], delete: remove = [] } = body
+  if (!Array.isArray(create) || !Array.isArray(reorder) || !isStringArray(remove)) {
+    return `create must be an array of objects, reorder ${reorderShape} and delete an array of IDs`
+  }
+  const count = create.length + remove.length +
+    reorder.reduce((sum, entry) => sum + (Array.isArray(entry?.song_ids) ? entry.song_ids.length : 1), 0)
+  if (count === 0) {
+    return "No operations given"
+  }
+  if (count > MAX_BULK_OPERATIONS) {
+    return `At most ${MAX_BULK_OPERATIONS} operations per request`
+  }
+  return null
+}
+
+function missingFields(doc, fields) {
+  return fields.filter(field => !isNonEmptyString(doc?.[field]))
+}
+
+function bulkCounts(result) {
+  return { created: result.insertedCount, reordered: result.matchedCount, deleted: result.deletedCount }
+}
+
+// Run a request's writes, then bump the catalog version and return it. An
+// unordered bulkWrite that throws (MongoBulkWriteError) has usually applied part
+// of the batch, and a failed cascade follows a write that went through, so the
+// change is published in every case; otherwise caches would keep serving the
+// old catalog. The published change records the counts that did apply, and the
+// write error is rethrown.
+async function publishAfter(db, summary, write) {
+  let completed = false
+  let version
+  try {
+    await write()
+    completed = true
+  } catch (error) {
+    if (error.result) {
+      Object.assign(summary, bulkCounts(error.result))
+    }
+    throw error
+  } finally {
+    const publishing = publishCatalogChange(db, completed ? summary : { ...summary, incomplete: true })
+    // Leave the write error, not a failed publish, as the one the caller sees
+    version = await (completed
+      ? publishing
+      : publishing.catch(error => console.error('Failed to publish catalog change:', error)))
+  }
+  return version
+}
+
+// Body: { create: [{ name, time_block, start_time, end_time, position? }],
+//         reorder: [playlist IDs in display order], delete: [playlist IDs] }
+// Created playlists without a position go after the existing ones, so they do not
+// take over a time block that already has a playlist. Deleting a playlist also
+// deletes its songs.
+export async function bulkPlaylists(db, body) {
+  const envelopeError = validateEnvelope(body, 'an array of playlist IDs')
+  if (envelopeError) {
+    return { error: envelopeError, status: 400 }
+  }
+  const { create = [], reorder = [], delete: remove = [] } = body
+  if (!isStringArray(reorder)) {
+    return { error: "reorder must be an array of playlist IDs", status: 400 }
+  }
+
+  const invalid = create
+    .map((playlist, index) => ({ index, missing: missingFields(playlist, PLAYLIST_FIELDS) }))
+    .filter(({ missing }) => missing.length)
+  if (invalid.length) {
+    return { error: "Invalid playlists in create", details: invalid.slice(0, 20), status: 400 }
+  }
+
+  const last = create.length
+    ? await db.collection('playlists').findOne({}, { sort: { position: -1 }, projection: { _id: 0, position: 1 } })
+    : null
+  let nextPosition = (last?.position ?? -1) + 1
+  const created = create.map(({ name, time_block, start_time, end_time, position }) => ({
+    id: uuidv4(),
+    name,
+    time_block,
+    start_time,
+    end_time,
+    position: Number.isFinite(position) ? position : nextPosition++
+  }))
+  const operations = [
+    ...created.map(document => ({ insertOne: { document: { ...document } } })),
+    ...reorder.map((id, position) => ({ updateOne: { filter: { id }, update: { $set: { position } } } })),
+    ...(remove.length ? [{ deleteMany: { filter: { id: { $in: remove } } } }] : [])
+  ]
+
+  const summary = { collection: 'playlists', created: 0, reordered: 0, deleted: 0, songs_deleted: 0 }
+  const version = await publishAfter(db, summary, async () => {
+    const result = await db.collection('playlists').bulkWrite(operations, { ordered: false })
+    Object.assign(summary, bulkCounts(result))
+    if (remove.length) {
+      summary.songs_deleted = (await db.collection('songs').deleteMany({ playlist_id: { $in: remove } })).deletedCount
+    }
+  })
+  return { ...summary, version, created_ids: created.map(playlist => playlist.id) }
+}
+
+// Body: { create: [{ playlist_id, title, artist, url, position? }],
+//         reorder: [{ playlist_id, song_ids: [IDs in play order] }], delete: [song IDs] }
+// Created songs without a position are appended to their playlist in the order given.
+export async function bulkSongs(db, body) {
+  const envelopeError = validateEnvelope(body, 'an array of { playlist_id, song_ids }')
+  if (envelopeError) {
+    return { error: envelopeError, status: 400 }
+  }
+  const { create = [], reorder = [], delete: remove = [] } = body
+  if (!reorder.every(entry => isNonEmptyString(entry?.playlist_id) && isStringArray(entry.song_ids))) {
+    return { error: "reorder must be an array of { playlist_id, song_ids }", status: 400 }
+  }
+
+  const invalid = create
+    .map((song, index) => ({ index, missing: missingFields(song, ['playlist_id', ...SONG_FIELDS]) }))
+    .filter(({ missing }) => missing.length)
+  if (invalid.length) {
+    return { error: "Invalid songs in create", details: invalid.slice(0, 20), status: 400 }
+  }
+
+  // Songs take their time block from the playlist, which therefore has to exist
+  const playlistIds = [...new Set(create.map(song => song.playlist_id))]
+  const [playlists, lastPositions] = playlistIds.length
+    ? await Promise.all([
+      db.collection('playlists')
+        .find({ id: { $in: playlistIds } }, { projection: { _id: 0, id: 1, time_block: 1 } })
+        .toArray(),
+      db.collection('songs')
+        .aggregate([
+          { $match: { playlist_id: { $in: playlistIds } } },
+          { $group: { _id: '$playlist_id', position: { $max: '$position' } } }
+        ])
+        .toArray()
+    ])
+    : [[], []]
+
+  const blocks = new Map(playlists.map(playlist => [playlist.id, playlist.time_block]))
+  const unknown = playlistIds.filter(id => !blocks.has(id))
+  if (unknown.length) {
+    return { error: "Unknown playlist_id in create", details: unknown.slice(0, 20), status: 400 }
+  }
+
+  const nextPosition = new Map(lastPositions.map(({ _id, position }) => [_id, (position ?? -1) + 1]))
+  const created = create.map(({ playlist_id, title, artist, url, position }) => {
+    const appended = nextPosition.get(playlist_id) ?? 0
+    nextPosition.set(playlist_id, appended + 1)
+    return {
+      id: uuidv4(),
+      playlist_id,
+      title,
+      artist,
+      url,
+      time_block: blocks.get(playlist_id),
+      position: Number.isFinite(position) ? position : appended
+    }
+  })
+
+  const operations = [
+    ...created.map(document => ({ insertOne: { document: { ...document } } })),
+    ...reorder.flatMap(({ playlist_id, song_ids }) => song_ids.map((id, position) => ({
+      updateOne: { filter: { id, playlist_id }, update: { $set: { position } } }
+    }))),
+    ...(remove.length ? [{ deleteMany: { filter: { id: { $in: remove } } } }] : [])
+  ]
+
+  const summary = {
+    collection: 'songs',
+    created: 0,
+    reordered: 0,
+    deleted: 0,
+    playlists: [...new Set([...playlistIds, ...reorder.map(entry => entry.playlist_id)])]
+  }
+  const version = await publishAfter(db, summary, async () => {
+    const result = await db.collection('songs').bulkWrite(operations, { ordered: false })
+    Object.assign(summary, bulkCounts(result))
+  })
+  return { ...summary, version, created_ids: created.map(song => song.id) }
+}
@@ -0,0 +1,537 @@
+import { EventEmitter } from 'events'
+import { v4 as uuidv4 } from 'uuid'
+import { incrementCounter, timePhase } from '@/lib/metrics'
+import { connectToMongo } from '@/lib/mongo'
+import { compileSchedule, isValidTimeZone, resolveBlock } from '@/lib/schedule'
+
+// Catalog access shared by the API route and the server-rendered page: sample
+// data and seeding, venue schedules, the read-through catalog cache and the
+// catalog version feed that invalidates it.
+
+// Time blocks configuration, seeded as the default venue's schedule.
+// Venues live in the `venues` collection and may define their own blocks
+// (minute granularity, optional `days`) and IANA timezone.
+const timeBlocks = [
+  { id: 'early-morning', name: 'Early Morning', start: '04:00', end: '08:00' },
+  { id: 'morning', name: 'Morning', start: '08:00', end: '12:00' },
+  { id: 'afternoon', name: 'Afternoon', start: '12:00', end: '16:00' },
+  { id: 'evening', name: 'Evening', start: '16:00', end: '20:00' },
+  { id: 'night', name: 'Night', start: '20:00', end: '24:00' },
+  { id: 'late-night', name: 'Late Night', start: '00:00', end: '04:00' }
+]
+
+export const DEFAULT_VENUE_ID = 'default'
+
+const defaultVenue = {
+  id: DEFAULT_VENUE_ID,
+  name: 'Default',
+  // Follows the server's local clock unless configured, matching the original behaviour
+  timezone: process.env.DEFAULT_TIMEZONE || Intl.DateTimeFormat().resolvedOptions().timeZone,
+  time_blocks: timeBlocks
+}
+
+// Sample playlists data
+const samplePlaylists = [
+  {
+    id: uuidv4(),
+    name: 'Dawn Serenity',
+    time_block: 'early-morning',
+    start_time: '04:00',
+    end_time: '08:00'
+  },
+  {
+    id: uuidv4(),
+    name: 'Coffee & Energy',
+    time_block: 'morning',
+    start_time: '08:00',
+    end_time: '12:00'
+  },
+  {
+    id: uuidv4(),
+    name: 'Afternoon Flow',
+    time_block: 'afternoon',
+    start_time: '12:00',
+    end_time: '16:00'
+  },
+  {
+    id: uuidv4(),
+    name: 'Golden Hour',
+    time_block: 'evening',
+    start_time: '16:00',
+    end_time: '20:00'
+  },
+  {
+    id: uuidv4(),
+    name: 'Night Vibes',
+    time_block: 'night',
+    start_time: '20:00',
+    end_time: '00:00'
+  },
+  {
+    id: uuidv4(),
+    name: 'Deep Sleep',
+    time_block: 'late-night',
+    start_time: '00:00',
+    end_time: '04:00'
+  }
+]
+
+// Sample songs data
+const sampleSongs = [
+  // Early Morning songs
+  { id: uuidv4(), playlist_id: null, title: 'Morning Mist', artist: 'Nature Sounds', url: '/api/audio/03.mp3', time_block: 'early-morning' },
+  { id: uuidv4(), playlist_id: null, title: 'Gentle Sunrise', artist: 'Ambient Dreams', url: '/api/audio/05.mp3', time_block: 'early-morning' },
+  { id: uuidv4(), playlist_id: null, title: 'Bird Song Symphony', artist: 'Forest Echoes', url: '/api/audio/06.mp3', time_block: 'early-morning' },
+  
+  // Morning songs
+  { id: uuidv4(), playlist_id: null, title: 'Fresh Start', artist: 'Positive Vibes', url: '/api/audio/03.mp3', time_block: 'morning' },
+  { id: uuidv4(), playlist_id: null, title: 'Morning Motivation', artist: 'Upbeat Collective', url: '/api/audio/05.mp3', time_block: 'morning' },
+  { id: uuidv4(), playlist_id: null, title: 'New Day Rising', artist: 'Energy Boost', url: '/api/audio/06.mp3', time_block: 'morning' },
+  
+  // Afternoon songs
+  { id: uuidv4(), playlist_id: null, title: 'Focus Mode', artist: 'Productivity Mix', url: '/api/audio/03.mp3', time_block: 'afternoon' },
+  { id: uuidv4(), playlist_id: null, title: 'Steady Rhythm', artist: 'Work Beats', url: '/api/audio/05.mp3', time_block: 'afternoon' },
+  { id: uuidv4(), playlist_id: null, title: 'Creative Energy', artist: 'Flow State', url: '/api/audio/06.mp3', time_block: 'afternoon' },
+  
+  // Evening songs
+  { id: uuidv4(), playlist_id: null, title: 'Sunset Dreams', artist: 'Chill Collective', url: '/api/audio/07.mp3', time_block: 'evening' },
+  { id: uuidv4(), playlist_id: null, title: 'Evening Breeze', artist: 'Relaxed Vibes', url: '/api/audio/08.mp3', time_block: 'evening' },
+  { id: uuidv4(), playlist_id: null, title: 'Twilight Glow', artist: 'Ambient Hour', url: '/api/audio/09.mp3', time_block: 'evening' },
+  
+  // Night songs
+  { id: uuidv4(), playlist_id: null, title: 'City Lights', artist: 'Urban Nights', url: '/api/audio/07.mp3', time_block: 'night' },
+  { id: uuidv4(), playlist_id: null, title: 'Midnight Groove', artist: 'Night Owls', url: '/api/audio/08.mp3', time_block: 'night' },
+  { id: uuidv4(), playlist_id: null, title: 'Starlit Sky', artist: 'Evening Jazz', url: '/api/audio/09.mp3', time_block: 'night' },
+  
+  // Late Night songs
+  { id: uuidv4(), playlist_id: null, title: 'Peaceful Slumber', artist: 'Sleep Sounds', url: '/api/audio/03.mp3', time_block: 'late-night' },
+  { id: uuidv4(), playlist_id: null, title: 'Night Rain', artist: 'Calm Waters', url: '/api/audio/05.mp3', time_block: 'late-night' },
+  { id: uuidv4(), playlist_id: null, title: 'Dream State', artist: 'Soft Melodies', url: '/api/audio/06.mp3', time_block: 'late-night' }
+]
+
+// Upper bound on how long a cached read or compiled venue schedule is served.
+// Writes through publishCatalogChange invalidate at once; this catches edits
+// made straight in Mongo (e.g. a venue's time_blocks) that bump no version.
+const CACHE_MAX_AGE_MS = Number(process.env.CATALOG_CACHE_MAX_AGE_MS || 60 * 1000)
+
+// Without change streams (standalone mongod), how often to check the catalog
+// version for writes made by other instances or scripts
+const VERSION_POLL_MS = Number(process.env.CATALOG_VERSION_POLL_MS || 5 * 1000)
+
+// Catalog documents are returned without Mongo's internal _id
+export const PUBLIC_FIELDS = { projection: { _id: 0 } }
+
+// Display order of playlists. Several may share a time block; the first in this
+// order is the one that plays, so every list the player picks from uses it too.
+export const PLAYLIST_ORDER = { position: 1, id: 1 }
+
+// Indexes backing the catalog lookups in the API route
+async function ensureIndexes(db) {
+  await Promise.all([
+    db.collection('playlists').createIndex({ id: 1 }, { unique: true }),
+    db.collection('playlists').createIndex({ time_block: 1, ...PLAYLIST_ORDER }),
+    db.collection('venues').createIndex({ id: 1 }, { unique: true }),
+    // Playlist contents in their stored order
+    db.collection('songs').createIndex({ playlist_id: 1, position: 1 }),
+    db.collection('playlists').createIndex(PLAYLIST_ORDER),
+    // Keyset pagination over /api/songs, optionally filtered
+    db.collection('songs').createIndex({ id: 1 }, { unique: true }),
+    db.collection('songs').createIndex({ time_block: 1, id: 1 }),
+    db.collection('songs').createIndex({ artist: 1, id: 1 })
+  ])
+}
+
+// Catalog state shared by the API route, the server-rendered page and the startup
+// hook. Next.js bundles those separately, so (like the Mongo client) it lives on
+// globalThis instead of in module scope.
+const state = globalThis[Symbol.for('salil.catalog')] ??= {
+  // Read-through cache for catalog reads, dropped whenever the catalog is written
+  // and otherwise kept for CACHE_MAX_AGE_MS. Time-dependent reads are keyed by time
+  // block, so a block change moves them to a different entry rather than making an
+  // existing one stale.
+  cache: new Map(),
+  stats: { hits: 0, misses: 0, coalesced: 0 },
+  // Loads in progress by key; identical reads arriving meanwhile share the one query
+  inflight: new Map(),
+  // Bumped on invalidation so a load that started before a write isn't cached after it
+  generation: 0,
+  // Compiled minute-of-week schedules by venue ID, as { promise, expiresAt } so
+  // concurrent first requests share a load
+  venueSchedules: new Map(),
+  seedPromise: null,
+  // Catalog version last applied in this process, and the feed announcing new ones
+  version: 0,
+  events: new EventEmitter().setMaxListeners(0),
+  changeStream: null,
+  versionPoll: null
+}
+
+export function getCacheStats() {
+  return { ...state.stats, entries: state.cache.size }
+}
+
+export function cachedRead(key, load, { cacheEmpty = true } = {}) {
+  const entry = state.cache.get(key)
+  if (entry && entry.expiresAt <= Date.now()) {
+    state.cache.delete(key)
+  } else if (entry) {
+    state.stats.hits++
+    incrementCounter('salil_catalog_cache_requests_total', { result: 'hit' })
+    return Promise.resolve(entry.value)
+  }
+
+  if (state.inflight.has(key)) {
+    state.stats.coalesced++
+    incrementCounter('salil_catalog_cache_requests_total', { result: 'coalesced' })
+    return state.inflight.get(key)
+  }
+
+  state.stats.misses++
+  incrementCounter('salil_catalog_cache_requests_total', { result: 'miss' })
+  const generation = state.generation
+  const promise = timePhase('query', load)
+    .then(value => {
+      // Lookups by caller-supplied IDs skip caching misses so junk IDs can't grow the map
+      if ((value || cacheEmpty) && generation === state.generation) {
+        state.cache.set(key, { value, expiresAt: Date.now() + CACHE_MAX_AGE_MS })
+      }
+      return value
+    })
+    .finally(() => {
+      if (state.inflight.get(key) === promise) {
+        state.inflight.delete(key)
+      }
+    })
+  state.inflight.set(key, promise)
+  return promise
+}
+
+export function invalidateCatalogCache() {
+  state.generation++
+  state.cache.clear()
+  state.inflight.clear()
+  state.venueSchedules.clear()
+}
+
+function getVenueSchedule(db, venueId) {
+  const { venueSchedules } = state
+  const cached = venueSchedules.get(venueId)
+  if (cached && cached.expiresAt > Date.now()) {
+    return cached.promise
+  }
+
+  const promise = db.collection('venues')
+    .findOne({ id: venueId }, PUBLIC_FIELDS)
+    .then(venue => venue && { venue, compiled: compileSchedule(venue.time_blocks) })
+  const entry = { promise, expiresAt: Date.now() + CACHE_MAX_AGE_MS }
+  // Don't keep failures or unknown venue IDs around
+  const forget = () => venueSchedules.get(venueId) === entry && venueSchedules.delete(venueId)
+  promise
+    .then(schedule => !schedule && forget())
+    .catch(forget)
+  venueSchedules.set(venueId, entry)
+  return promise
+}
+
+// Resolve a venue (default venue if omitted) and timezone (the venue's if omitted)
+// to the active block; { error, status } for unknown venues or timezones
+export async function resolveTimeBlock(db, { venue, tz } = {}) {
+  const schedule = await getVenueSchedule(db, venue || DEFAULT_VENUE_ID)
+  if (!schedule) {
+    return { error: "Venue not found", status: 404 }
+  }
+
+  const timeZone = tz || schedule.venue.timezone
+  if (!isValidTimeZone(timeZone)) {
+    return { error: `Unknown timezone "${timeZone}"`, status: 400 }
+  }
+
+  return { venue: schedule.venue, timeZone, ...resolveBlock(schedule.compiled, timeZone) }
+}
+
+// Body of GET /api/time-blocks as { body }: a venue's block configuration and which
+// block is active in the given timezone, with when that changes; or { error, status }
+export async function getTimeBlocks(db, options) {
+  const resolved = await resolveTimeBlock(db, options)
+  if (resolved.error) {
+    return resolved
+  }
+
+  return {
+    body: {
+      venue: resolved.venue.id,
+      name: resolved.venue.name,
+      timezone: resolved.timeZone,
+      time_blocks: resolved.venue.time_blocks,
+      current_time_block: resolved.block?.id ?? null,
+      next_time_block: resolved.nextBlock?.id ?? null,
+      next_change_at: resolved.nextChangeAt.toISOString()
+    }
+  }
+}
+
+// The playlist scheduled for a block, with its songs
+export function getBlockPlaylist(db, timeBlock) {
+  return cachedRead(`current-playlist:${timeBlock}`, async () => {
+    const playlist = await db.collection('playlists')
+      .findOne({ time_block: timeBlock }, { ...PUBLIC_FIELDS, sort: PLAYLIST_ORDER })
+    if (!playlist) {
+      return null
+    }
+
+    const songs = await db.collection('songs')
+      .find({ playlist_id: playlist.id }, PUBLIC_FIELDS)
+      .sort({ position: 1 })
+      .toArray()
+
+    return { playlist, songs }
+  })
+}
+
+export function getCatalogVersion() {
+  return state.version
+}
+
+// Listen for catalog changes ({ version, change }); returns the unsubscribe function
+export function subscribeToCatalog(listener) {
+  state.events.on('change', listener)
+  return () => state.events.off('change', listener)
+}
+
+// Drop cached reads and notify subscribers, once per version however it arrived
+// (our own write, or another process's through the change stream)
+function applyCatalogVersion(meta) {
+  if (!meta || meta.version <= state.version) {
+    return
+  }
+  state.version = meta.version
+  invalidateCatalogCache()
+  state.events.emit('change', { version: meta.version, change: meta.last_change || null })
+}
+
+// Record a catalog write: bump the version in `meta` and publish it. `change`
+// describes the write for subscribers, e.g. { collection: 'songs', created: 3 }.
+export async function publishCatalogChange(db, change) {
+  const meta = await db.collection('meta').findOneAndUpdate(
+    { _id: 'catalog' },
+    { $inc: { version: 1 }, $set: { last_change: change, updated_at: new Date() } },
+    { upsert: true, returnDocument: 'after' }
+  )
+  applyCatalogVersion(meta)
+  return meta.version
+}
+
+// Read the stored version every VERSION_POLL_MS; the fallback when there is no change stream
+function pollCatalogVersion(db) {
+  if (state.versionPoll) {
+    return
+  }
+  state.versionPoll = setInterval(() => {
+    db.collection('meta').findOne({ _id: 'catalog' })
+      .then(applyCatalogVersion)
+      .catch(error => console.error('Catalog version poll failed:', error))
+  }, VERSION_POLL_MS)
+  state.versionPoll.unref?.()
+}
+
+// Other instances' writes (and scripts such as the indexer, which bump the same
+// version) arrive through a change stream on a replica set or mongos, and by
+// polling the version on a standalone server.
+async function watchCatalog(db) {
+  const current = await db.collection('meta').findOne({ _id: 'catalog' })
+  applyCatalogVersion(current)
+
+  const hello = await db.admin().command({ hello: 1 })
+  if (!hello.setName && hello.msg !== 'isdbgrid') {
+    pollCatalogVersion(db)
+    return
+  }
+  if (state.changeStream) {
+    return
+  }
+
+  const stream = db.collection('meta').watch(
+    [{ $match: { 'documentKey._id': 'catalog' } }],
+    { fullDocument: 'updateLookup' }
+  )
+  stream.on('change', event => applyCatalogVersion(event.fullDocument))
+  stream.on('error', error => {
+    console.error('Catalog change stream failed, falling back to polling:', error)
+    state.changeStream = null
+    stream.close().catch(() => {})
+    pollCatalogVersion(db)
+  })
+  state.changeStream = stream
+}
+
+// Body of GET /api/current-playlist as { body }, or { error, status }
+export async function getCurrentPlaylist(db, options) {
+  const resolved = await resolveTimeBlock(db, options)
+  if (resolved.error) {
+    return resolved
+  }
+  if (!resolved.block) {
+    return { error: "No time block scheduled for current time", status: 404 }
+  }
+
+  const data = await getBlockPlaylist(db, resolved.block.id)
+  if (!data) {
+    return { error: "No playlist found for current time", status: 404 }
+  }
+
+  return {
+    body: {
+      ...data,
+      current_time_block: resolved.block.id,
+      next_time_block: resolved.nextBlock?.id ?? null,
+      next_change_at: resolved.nextChangeAt.toISOString(),
+      venue: resolved.venue.id,
+      timezone: resolved.timeZone
+    }
+  }
+}
+
+// Every playlist with its songs in one aggregation, so clients can switch
+// time blocks without further requests
+export function getSchedule(db) {
+  return cachedRead('schedule', async () => {
+    const playlists = await db.collection('playlists')
+      .aggregate([
+        { $sort: PLAYLIST_ORDER },
+        {
+          $lookup: {
+            from: 'songs',
+            localField: 'id',
+            foreignField: 'playlist_id',
+            pipeline: [{ $sort: { position: 1 } }],
+            as: 'songs'
+          }
+        },
+        { $project: { _id: 0, 'songs._id': 0 } }
+      ])
+      .toArray()
+
+    return playlists.map(({ songs, ...playlist }) => ({ playlist, songs }))
+  })
+}
+
+// Bump whenever samplePlaylists or sampleSongs change so existing databases get re-seeded
+const SEED_VERSION = 4
+
+// How long a seeding instance may hold the lock before another may take over
+const SEED_LOCK_TTL_MS = 60000
+const SEED_LOCK_POLL_MS = 250
+
+// Take the cross-process seed lock in `meta`. The upsert only matches a missing or
+// expired lock; a live one makes it insert a duplicate _id, which fails.
+async function acquireSeedLock(db, owner) {
+  const now = new Date()
+  try {
+    await db.collection('meta').updateOne(
+      { _id: 'seed-lock', expires_at: { $lt: now } },
+      { $set: { owner, expires_at: new Date(now.getTime() + SEED_LOCK_TTL_MS) } },
+      { upsert: true }
+    )
+    return true
+  } catch (error) {
+    if (error.code === 11000) {
+      return false
+    }
+    throw error
+  }
+}
+
+// Upsert the sample catalog. Playlists are keyed by time block and songs by
+// (time block, title), so re-running is a no-op and concurrent readers never
+// observe empty collections.
+async function writeSeedData(db) {
+  await db.collection('playlists').bulkWrite(samplePlaylists.map(({ id, ...playlist }, position) => ({
+    updateOne: {
+      filter: { time_block: playlist.time_block },
+      update: { $set: { ...playlist, position }, $setOnInsert: { id } },
+      upsert: true
+    }
+  })))
+
+  // Resolve the stored playlist IDs, which survive from earlier seeds
+  const playlists = await db.collection('playlists')
+    .find({}, { projection: { _id: 0, id: 1, time_block: 1 } })
+    .toArray()
+  const playlistIdsByBlock = Object.fromEntries(playlists.map(p => [p.time_block, p.id]))
+
+  // Songs keep their listed order within each block
+  const positions = {}
+  await db.collection('songs').bulkWrite(sampleSongs.map(({ id, ...song }) => ({
+    updateOne: {
+      filter: { time_block: song.time_block, title: song.title },
+      update: {
+        $set: {
+          ...song,
+          playlist_id: playlistIdsByBlock[song.time_block] || null,
+          position: positions[song.time_block] = (positions[song.time_block] ?? -1) + 1
+        },
+        $setOnInsert: { id }
+      },
+      upsert: true
+    }
+  })))
+
+  // Only created when missing, so venue schedules edited in Mongo are kept
+  await db.collection('venues').updateOne(
+    { id: DEFAULT_VENUE_ID },
+    { $setOnInsert: defaultVenue },
+    { upsert: true }
+  )
+
+  await db.collection('meta').updateOne(
+    { _id: 'seed' },
+    { $set: { version: SEED_VERSION, seeded_at: new Date() } },
+    { upsert: true }
+  )
+  await publishCatalogChange(db, { type: 'seed', seed_version: SEED_VERSION })
+}
+
+// Seed if the catalog is missing or was written by an older SEED_VERSION. The
+// upsert keys have no unique index (user playlists may share a block), so only
+// the instance holding the seed lock writes; the others wait for it to finish.
+async function seedDatabase() {
+  const db = await connectToMongo()
+  await ensureIndexes(db)
+
+  const owner = uuidv4()
+  for (;;) {
+    const seed = await db.collection('meta').findOne({ _id: 'seed' })
+    if (seed && seed.version === SEED_VERSION) {
+      await watchCatalog(db)
+      return
+    }
+    if (await acquireSeedLock(db, owner)) {
+      break
+    }
+    await new Promise(resolve => setTimeout(resolve, SEED_LOCK_POLL_MS))
+  }
+
+  try {
+    // Another instance may have finished between our check and taking the lock
+    const seed = await db.collection('meta').findOne({ _id: 'seed' })
+    if (!seed || seed.version !== SEED_VERSION) {
+      await writeSeedData(db)
+      console.log(`Database seeded with sample data (version ${SEED_VERSION})`)
+    }
+  } finally {
+    await db.collection('meta').deleteOne({ _id: 'seed-lock', owner })
+  }
+  await watchCatalog(db)
+}
+
+// Create indexes and seed sample data, once per process
+export function initializeDatabase() {
+  if (!state.seedPromise) {
+    state.seedPromise = seedDatabase().catch(error => {
+      console.error('Database initialization error:', error)
+      // Allow the next request to retry
+      state.seedPromise = null
+    })
+  }
+  return state.seedPromise
+}
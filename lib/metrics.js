@@ -0,0 +1,159 @@
+import { AsyncLocalStorage } from 'async_hooks'
+import { performance } from 'perf_hooks'
+
+// In-process metrics for the API, rendered in Prometheus text format by /api/metrics.
+// Per-request phase timings are collected through AsyncLocalStorage so helpers deep
+// in a handler can call timePhase() without a timer being passed around.
+
+// Histogram bucket upper bounds, in seconds
+const BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5]
+
+const HELP = {
+  salil_http_requests_total: ['counter', 'API requests by route, method and status'],
+  salil_http_request_duration_seconds: ['histogram', 'Time until the handler returned a response'],
+  salil_http_phase_duration_seconds: ['histogram', 'Time spent per handler phase (connect, init, query, serialize)'],
+  salil_http_requests_in_flight: ['gauge', 'API requests currently being handled'],
+  salil_http_errors_total: ['counter', 'API responses with a 5xx status'],
+  salil_mongo_commands_total: ['counter', 'MongoDB commands by name and outcome'],
+  salil_mongo_command_duration_seconds: ['histogram', 'MongoDB command round-trip time'],
+  salil_mongo_connections_created_total: ['counter', 'MongoDB pool connections opened'],
+  salil_mongo_connections_open: ['gauge', 'MongoDB pool connections currently open'],
+  salil_catalog_cache_requests_total: ['counter', 'Catalog cache lookups by result (hit, miss, coalesced)']
+}
+
+// Kept on globalThis so the separately bundled instrumentation hook (which opens
+// the Mongo pool at startup) records into the same series as the route handlers
+const registry = globalThis[Symbol.for('salil.metrics')] ??= {
+  counters: new Map(),
+  gauges: new Map(),
+  histograms: new Map()
+}
+const { counters, gauges, histograms } = registry
+
+const requestContext = new AsyncLocalStorage()
+
+function seriesKey(name, labels) {
+  const pairs = Object.entries(labels)
+    .map(([key, value]) => `${key}="${String(value).replace(/\\/g, '\\\\').replace(/"/g, '\\"')}"`)
+    .join(',')
+  return pairs ? `${name}{${pairs}}` : name
+}
+
+export function incrementCounter(name, labels = {}, by = 1) {
+  const key = seriesKey(name, labels)
+  counters.set(key, (counters.get(key) || 0) + by)
+}
+
+export function addToGauge(name, labels = {}, by = 1) {
+  const key = seriesKey(name, labels)
+  gauges.set(key, (gauges.get(key) || 0) + by)
+}
+
+export function observeHistogram(name, labels, seconds) {
+  const key = seriesKey(name, labels)
+  let histogram = histograms.get(key)
+  if (!histogram) {
+    histogram = { name, labels, counts: new Array(BUCKETS.length).fill(0), sum: 0, count: 0 }
+    histograms.set(key, histogram)
+  }
+  const bucket = BUCKETS.findIndex(bound => seconds <= bound)
+  if (bucket !== -1) {
+    histogram.counts[bucket]++
+  }
+  histogram.sum += seconds
+  histogram.count++
+}
+
+export function recordMongoCommand(commandName, durationMs, succeeded) {
+  const labels = { command: commandName }
+  incrementCounter('salil_mongo_commands_total', { ...labels, outcome: succeeded ? 'success' : 'failure' })
+  observeHistogram('salil_mongo_command_duration_seconds', labels, durationMs / 1000)
+}
+
+class RequestTimer {
+  constructor(route, method) {
+    this.route = route
+    this.method = method
+    this.started = performance.now()
+    this.phases = []
+  }
+
+  record(phase, durationMs) {
+    this.phases.push({ phase, durationMs })
+    observeHistogram('salil_http_phase_duration_seconds', { route: this.route, phase }, durationMs / 1000)
+  }
+
+  // Server-Timing header value, e.g. "connect;dur=0.4, query;dur=3.1, total;dur=4.2"
+  serverTiming() {
+    const entries = this.phases.map(({ phase, durationMs }) => `${phase};dur=${durationMs.toFixed(1)}`)
+    entries.push(`total;dur=${(performance.now() - this.started).toFixed(1)}`)
+    return entries.join(', ')
+  }
+
+  finish(status) {
+    const labels = { route: this.route, method: this.method }
+    observeHistogram('salil_http_request_duration_seconds', labels, (performance.now() - this.started) / 1000)
+    incrementCounter('salil_http_requests_total', { ...labels, status })
+    if (status >= 500) {
+      incrementCounter('salil_http_errors_total', labels)
+    }
+  }
+}
+
+// Run `handler` with a request timer in scope and the in-flight gauge raised
+export async function withRequestMetrics(route, method, handler) {
+  const timer = new RequestTimer(route, method)
+  addToGauge('salil_http_requests_in_flight')
+  try {
+    const response = await requestContext.run(timer, handler)
+    timer.finish(response.status)
+    return { response, timer }
+  } finally {
+    addToGauge('salil_http_requests_in_flight', {}, -1)
+  }
+}
+
+// Time `fn` (sync or async) as a phase of the current request, if there is one
+export function timePhase(phase, fn) {
+  const timer = requestContext.getStore()
+  if (!timer) {
+    return fn()
+  }
+
+  const started = performance.now()
+  const finish = () => timer.record(phase, performance.now() - started)
+  const result = fn()
+  if (result && typeof result.then === 'function') {
+    return result.finally(finish)
+  }
+  finish()
+  return result
+}
+
+export function renderPrometheus() {
+  const families = new Map()
+  const add = (name, line) => {
+    if (!families.has(name)) families.set(name, [])
+    families.get(name).push(line)
+  }
+
+  for (const [key, value] of counters) add(key.split('{')[0], `${key} ${value}`)
+  for (const [key, value] of gauges) add(key.split('{')[0], `${key} ${value}`)
+  for (const { name, labels, counts, sum, count } of histograms.values()) {
+    let cumulative = 0
+    BUCKETS.forEach((bound, i) => {
+      cumulative += counts[i]
+      add(name, `${seriesKey(`${name}_bucket`, { ...labels, le: bound })} ${cumulative}`)
+    })
+    add(name, `${seriesKey(`${name}_bucket`, { ...labels, le: '+Inf' })} ${count}`)
+    add(name, `${seriesKey(`${name}_sum`, labels)} ${sum}`)
+    add(name, `${seriesKey(`${name}_count`, labels)} ${count}`)
+  }
+
+  const lines = []
+  for (const [name, samples] of families) {
+    const [type, help] = HELP[name] || ['untyped', name]
+    lines.push(`# HELP ${name} ${help}`, `# TYPE ${name} ${type}`, ...samples)
+  }
+  return lines.join('\n') + '\n'
+}
@@ -0,0 +1,56 @@
+import { MongoClient } from 'mongodb'
+import { addToGauge, incrementCounter, recordMongoCommand } from '@/lib/metrics'
+
+// One MongoClient per process. Next.js bundles instrumentation.js and the route
+// handlers separately, so the connection is kept on globalThis rather than in
+// module state; otherwise the startup warm-up would open a second pool.
+const GLOBAL_KEY = Symbol.for('salil.mongo')
+
+function envInt(name, fallback) {
+  const value = Number.parseInt(process.env[name], 10)
+  return Number.isFinite(value) ? value : fallback
+}
+
+// Pool settings, overridable through the environment
+export const poolOptions = {
+  maxPoolSize: envInt('MONGO_MAX_POOL_SIZE', 20),
+  minPoolSize: envInt('MONGO_MIN_POOL_SIZE', 2),
+  maxIdleTimeMS: envInt('MONGO_MAX_IDLE_TIME_MS', 60000),
+  waitQueueTimeoutMS: envInt('MONGO_WAIT_QUEUE_TIMEOUT_MS', 5000),
+  connectTimeoutMS: envInt('MONGO_CONNECT_TIMEOUT_MS', 5000),
+  serverSelectionTimeoutMS: envInt('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000),
+  socketTimeoutMS: envInt('MONGO_SOCKET_TIMEOUT_MS', 30000)
+}
+
+async function createConnection() {
+  // Command monitoring feeds the Mongo counters on /api/metrics
+  const client = new MongoClient(process.env.MONGO_URL, { ...poolOptions, monitorCommands: true })
+  client.on('commandSucceeded', event => recordMongoCommand(event.commandName, event.duration, true))
+  client.on('commandFailed', event => recordMongoCommand(event.commandName, event.duration, false))
+  client.on('connectionCreated', () => {
+    incrementCounter('salil_mongo_connections_created_total')
+    addToGauge('salil_mongo_connections_open')
+  })
+  client.on('connectionClosed', () => addToGauge('salil_mongo_connections_open', {}, -1))
+
+  try {
+    await client.connect()
+  } catch (error) {
+    await client.close().catch(() => {})
+    throw error
+  }
+  return { client, db: client.db(process.env.DB_NAME || 'salil_music_db') }
+}
+
+// Single-flight: concurrent first callers all await the same connect
+export async function connectToMongo() {
+  if (!globalThis[GLOBAL_KEY]) {
+    globalThis[GLOBAL_KEY] = createConnection().catch(error => {
+      // Allow the next request to retry
+      globalThis[GLOBAL_KEY] = null
+      throw error
+    })
+  }
+  const { db } = await globalThis[GLOBAL_KEY]
+  return db
+}
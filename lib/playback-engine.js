@@ -0,0 +1,434 @@
+// Gapless playback on the Web Audio API. The next track is fetched and decoded
+// while the current one plays, then scheduled on the AudioContext clock to start
+// on the exact sample the current one ends (or `crossfade` seconds earlier,
+// with equal-length gain ramps on both tracks). An optional `getGain(song)`
+// supplies a per-track loudness correction in dB, applied before the fades.
+//
+// A track that fails to fetch or decode is skipped for the one after it, so an
+// unattended venue keeps playing. Consecutive failures back off exponentially;
+// after MAX_LOAD_ATTEMPTS in a row the engine stops and calls `onStop`.
+//
+// Decoded PCM costs about 384 KB per second of 48 kHz stereo, and the current and
+// upcoming tracks are both held. Tracks longer than MAX_DECODED_SECONDS (long
+// venue mixes) are therefore streamed through an <audio> element instead; their
+// duration comes from a metadata-only probe. Streamed tracks join on a timer
+// rather than on the exact sample, so the gapless guarantee covers tracks up
+// to the cap.
+
+// Seconds between scheduling a source and its start time, so it never starts late
+const LOOKAHEAD = 0.05
+
+// Six minutes decodes to ~140 MB at 48 kHz stereo, so ~280 MB for both voices
+const MAX_DECODED_SECONDS = 6 * 60
+
+const MAX_LOAD_ATTEMPTS = 8
+const RETRY_BASE_MS = 1000
+const RETRY_MAX_MS = 30 * 1000
+
+export class PlaybackEngine {
+  constructor({
+    crossfade = 0,
+    getGain = null,
+    onTrackChange = () => {},
+    onError = console.error,
+    onStop = () => {}
+  } = {}) {
+    this.crossfade = crossfade
+    this.getGain = getGain
+    this.onTrackChange = onTrackChange
+    this.onError = onError
+    this.onStop = onStop
+
+    this.queue = []
+    this.index = 0
+    // Where to continue after the current track when the queue was swapped underneath it
+    this.pendingIndex = null
+    this.playing = false
+    this.volume = 1
+
+    this.context = null
+    this.master = null
+    // Loaded tracks by URL, as { duration, buffer } with a null buffer for
+    // streamed ones; only the current and upcoming ones are retained
+    this.buffers = new Map()
+    this.current = null
+    this.upcoming = null
+    this.transitionTimer = null
+    // Pending skip past a track that failed to load
+    this.retryTimer = null
+    // Bumped whenever playback is restarted so stale async work is discarded
+    this.generation = 0
+    this.upcomingToken = null
+  }
+
+  // Created lazily from play(), which runs inside a user gesture as autoplay rules require
+  ensureContext() {
+    if (!this.context) {
+      const AudioContextClass = window.AudioContext || window.webkitAudioContext
+      this.context = new AudioContextClass()
+      this.master = this.context.createGain()
+      this.master.gain.value = this.volume
+      this.master.connect(this.context.destination)
+    }
+    return this.context
+  }
+
+  // Duration from the file's metadata; the browser reads the start of the file
+  // with a Range request rather than downloading it whole
+  probeDuration(url) {
+    return new Promise((resolve, reject) => {
+      const element = new Audio()
+      element.preload = 'metadata'
+      const release = () => {
+        element.onloadedmetadata = null
+        element.onerror = null
+        element.removeAttribute('src')
+        element.load()
+      }
+      element.onloadedmetadata = () => {
+        const duration = element.duration
+        release()
+        resolve(duration)
+      }
+      element.onerror = () => {
+        release()
+        reject(new Error(`Failed to read ${url}`))
+      }
+      element.src = url
+    })
+  }
+
+  loadBuffer(url) {
+    if (!this.buffers.has(url)) {
+      const promise = this.probeDuration(url)
+        .then(duration => {
+          // Non-finite durations are live or unknown-length streams
+          if (!Number.isFinite(duration) || duration > MAX_DECODED_SECONDS) {
+            return { duration, buffer: null }
+          }
+          return fetch(url)
+            .then(response => {
+              if (!response.ok) {
+                throw new Error(`Failed to fetch ${url}: HTTP ${response.status}`)
+              }
+              return response.arrayBuffer()
+            })
+            .then(data => this.context.decodeAudioData(data))
+            .then(buffer => ({ duration: buffer.duration, buffer }))
+        })
+      promise.catch(() => this.buffers.delete(url))
+      this.buffers.set(url, promise)
+    }
+    return this.buffers.get(url)
+  }
+
+  pruneBuffers() {
+    const keep = new Set([this.current?.url, this.upcoming?.url])
+    for (const url of this.buffers.keys()) {
+      if (!keep.has(url)) {
+        this.buffers.delete(url)
+      }
+    }
+  }
+
+  // Decoded buffer plus normalization gain (dB); a missing gain just plays at unity
+  loadTrack(song) {
+    const gain = this.getGain
+      ? Promise.resolve(this.getGain(song)).catch(() => 0)
+      : Promise.resolve(0)
+    return Promise.all([this.loadBuffer(song.url), gain])
+  }
+
+  createVoice(track, url, index, startAt, gainDb = 0) {
+    let source
+    let element = null
+    if (track.buffer) {
+      source = this.context.createBufferSource()
+      source.buffer = track.buffer
+    } else {
+      element = new Audio()
+      element.crossOrigin = 'anonymous'
+      element.preload = 'auto'
+      element.src = url
+      source = this.context.createMediaElementSource(element)
+    }
+    const normalize = this.context.createGain()
+    normalize.gain.value = Math.pow(10, (gainDb || 0) / 20)
+    const gain = this.context.createGain()
+    source.connect(normalize).connect(gain).connect(this.master)
+
+    const voice = { index, url, source, element, gain, startAt, endAt: startAt + track.duration, startTimer: null }
+    if (element) {
+      element.onended = () => gain.disconnect()
+      if (this.playing) this.startElement(voice)
+    } else {
+      source.onended = () => gain.disconnect()
+      source.start(startAt)
+    }
+    return voice
+  }
+
+  // A streamed voice cannot be started on the audio clock; start its element
+  // when the clock reaches startAt (at once if it already has)
+  startElement(voice) {
+    clearTimeout(voice.startTimer)
+    const delay = Math.max(0, (voice.startAt - this.context.currentTime) * 1000)
+    voice.startTimer = setTimeout(() => voice.element.play().catch(this.onError), delay)
+  }
+
+  stopVoice(voice) {
+    if (!voice) return
+    if (voice.element) {
+      clearTimeout(voice.startTimer)
+      voice.element.onended = null
+      voice.element.pause()
+      voice.element.removeAttribute('src')
+      voice.element.load()
+    } else {
+      voice.source.onended = null
+      voice.source.stop()
+    }
+    voice.gain.disconnect()
+  }
+
+  // Streamed voices in play; they keep running while the context is suspended
+  elementVoices() {
+    return [this.current, this.upcoming].filter(voice => voice?.element)
+  }
+
+  stopAll() {
+    this.generation++
+    this.upcomingToken = null
+    clearTimeout(this.transitionTimer)
+    clearTimeout(this.retryTimer)
+    this.stopVoice(this.current)
+    this.stopVoice(this.upcoming)
+    this.current = null
+    this.upcoming = null
+  }
+
+  // Run `retry` after the backoff for `attempt`, or stop once the attempts are used up
+  retryAfterFailure(attempt, retry) {
+    clearTimeout(this.retryTimer)
+    if (attempt + 1 >= MAX_LOAD_ATTEMPTS) {
+      this.giveUp()
+      return
+    }
+    const delay = Math.min(RETRY_BASE_MS * 2 ** attempt, RETRY_MAX_MS)
+    this.retryTimer = setTimeout(retry, delay)
+  }
+
+  // Too many tracks in a row failed: stop rather than retry forever. play()
+  // starts over from the track that was playing, or the last one tried.
+  giveUp() {
+    this.onError(new Error(`Playback stopped after ${MAX_LOAD_ATTEMPTS} tracks in a row failed to load`))
+    const generation = this.generation
+    // Let the track that is still playing finish first; the audio clock stands
+    // still while paused, so keep checking until it has really ended
+    const stopAfterCurrent = () => {
+      if (generation !== this.generation) return
+      const remaining = this.current ? this.current.endAt - this.context.currentTime : 0
+      if (remaining > 0) {
+        this.retryTimer = setTimeout(stopAfterCurrent, remaining * 1000)
+        return
+      }
+      this.playing = false
+      this.stopAll()
+      this.context?.suspend()
+      this.onStop()
+    }
+    stopAfterCurrent()
+  }
+
+  async startCurrent(attempt = 0) {
+    const generation = this.generation
+    const song = this.queue[this.index]
+    if (!song) return
+
+    this.ensureContext()
+    try {
+      const [track, gainDb] = await this.loadTrack(song)
+      if (generation !== this.generation || !this.playing || this.current) return
+
+      this.current = this.createVoice(track, song.url, this.index, this.context.currentTime + LOOKAHEAD, gainDb)
+      this.pruneBuffers()
+      this.scheduleUpcoming()
+    } catch (error) {
+      this.onError(error)
+      if (generation !== this.generation || !this.playing || this.current) return
+
+      this.retryAfterFailure(attempt, () => {
+        if (generation !== this.generation || !this.playing || this.current || !this.queue.length) return
+        this.index = (this.index + 1) % this.queue.length
+        this.onTrackChange(this.index, this.queue)
+        this.startCurrent(attempt + 1)
+      })
+    }
+  }
+
+  // Decode the track after the current one and schedule it back-to-back on the
+  // audio clock. `index` and `attempt` are only passed when skipping a failed track.
+  async scheduleUpcoming(index = null, attempt = 0) {
+    const current = this.current
+    if (!current || !this.queue.length) return
+
+    const token = Symbol('upcoming')
+    this.upcomingToken = token
+    index = index ?? this.pendingIndex ?? (current.index + 1) % this.queue.length
+    const song = this.queue[index]
+
+    try {
+      const [track, gainDb] = await this.loadTrack(song)
+      if (token !== this.upcomingToken || current !== this.current) return
+
+      const fade = Math.min(this.crossfade, track.duration / 2, (current.endAt - current.startAt) / 2)
+      const startAt = Math.max(current.endAt - fade, this.context.currentTime + LOOKAHEAD)
+      const voice = this.createVoice(track, song.url, index, startAt, gainDb)
+
+      if (fade > 0) {
+        current.gain.gain.setValueAtTime(1, startAt)
+        current.gain.gain.linearRampToValueAtTime(0, startAt + fade)
+        voice.gain.gain.setValueAtTime(0, startAt)
+        voice.gain.gain.linearRampToValueAtTime(1, startAt + fade)
+      }
+
+      this.upcoming = voice
+      this.armTransition()
+    } catch (error) {
+      this.onError(error)
+      if (token !== this.upcomingToken || current !== this.current) return
+
+      // Skipping ahead of the crossfade start still joins gaplessly; later, the
+      // next track starts as soon as it has decoded
+      this.retryAfterFailure(attempt, () => {
+        if (token !== this.upcomingToken || current !== this.current || !this.queue.length) return
+        this.scheduleUpcoming((index + 1) % this.queue.length, attempt + 1)
+      })
+    }
+  }
+
+  cancelUpcoming() {
+    this.upcomingToken = null
+    clearTimeout(this.transitionTimer)
+    clearTimeout(this.retryTimer)
+    if (this.upcoming) {
+      this.stopVoice(this.upcoming)
+      this.upcoming = null
+    }
+    if (this.current) {
+      // Undo any crossfade ramp that was scheduled against the cancelled track
+      this.current.gain.gain.cancelScheduledValues(0)
+      this.current.gain.gain.value = 1
+    }
+  }
+
+  // The audio is already scheduled; this timer only moves our bookkeeping
+  // (and the UI) over to the next track once it starts
+  armTransition() {
+    clearTimeout(this.transitionTimer)
+    if (!this.upcoming || !this.playing) return
+
+    const delay = Math.max(0, (this.upcoming.startAt - this.context.currentTime) * 1000)
+    this.transitionTimer = setTimeout(() => this.promoteUpcoming(), delay)
+  }
+
+  promoteUpcoming() {
+    if (!this.upcoming) return
+    // Timers can fire early relative to the audio clock
+    if (this.context.currentTime < this.upcoming.startAt - 0.01) {
+      this.armTransition()
+      return
+    }
+
+    this.current = this.upcoming
+    this.upcoming = null
+    this.index = this.current.index
+    this.pendingIndex = null
+    this.onTrackChange(this.index, this.queue)
+    this.pruneBuffers()
+    this.scheduleUpcoming()
+  }
+
+  // Replace the queue. With `immediate: false` the current track plays out and
+  // playback continues gaplessly from `index` of the new queue, which is how a
+  // time-block rollover is handled.
+  setQueue(songs, index = 0, { immediate = true } = {}) {
+    this.queue = songs || []
+    if (immediate || !this.current) {
+      this.jumpTo(index)
+      return
+    }
+    this.pendingIndex = index
+    this.cancelUpcoming()
+    this.scheduleUpcoming()
+  }
+
+  jumpTo(index) {
+    this.stopAll()
+    this.index = index
+    this.pendingIndex = null
+    this.onTrackChange(index, this.queue)
+    if (this.playing) {
+      this.startCurrent()
+    }
+  }
+
+  next() {
+    if (!this.queue.length) return
+    this.jumpTo((this.index + 1) % this.queue.length)
+  }
+
+  previous() {
+    if (!this.queue.length) return
+    this.jumpTo((this.index - 1 + this.queue.length) % this.queue.length)
+  }
+
+  play() {
+    if (this.playing) return
+    this.playing = true
+    this.ensureContext().resume()
+    if (this.current) {
+      this.elementVoices().forEach(voice => this.startElement(voice))
+      this.armTransition()
+    } else {
+      this.startCurrent()
+    }
+  }
+
+  // Suspending the context freezes the audio clock, so everything already
+  // scheduled stays sample-aligned when playback resumes
+  pause() {
+    if (!this.playing) return
+    this.playing = false
+    clearTimeout(this.transitionTimer)
+    this.elementVoices().forEach(voice => {
+      clearTimeout(voice.startTimer)
+      voice.element.pause()
+    })
+    this.context?.suspend()
+  }
+
+  // Playback position of the audible track in seconds, for progress displays
+  position() {
+    if (!this.current || !this.context) {
+      return { elapsed: 0, duration: 0 }
+    }
+    const duration = this.current.endAt - this.current.startAt
+    const elapsed = Math.min(Math.max(this.context.currentTime - this.current.startAt, 0), duration)
+    return { elapsed, duration }
+  }
+
+  setVolume(volume) {
+    this.volume = volume
+    if (this.master) {
+      this.master.gain.setTargetAtTime(volume, this.context.currentTime, 0.01)
+    }
+  }
+
+  destroy() {
+    this.playing = false
+    this.stopAll()
+    this.buffers.clear()
+    this.context?.close()
+  }
+}
@@ -0,0 +1,102 @@
+// Time-block schedules compiled into minute-of-week lookup tables.
+//
+// A schedule is a list of blocks like { id, name, start: '04:00', end: '08:00', days: [1, 2] }
+// (days are 0 = Sunday .. 6 = Saturday and default to every day; an end at or before
+// the start wraps past midnight). Compiling it yields, for each of the 10080 minutes
+// in a week, the active block and how many minutes remain until the block changes,
+// so resolving "which block is on now, and until when" is two array reads.
+
+const MINUTES_PER_DAY = 24 * 60
+const MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+const NO_BLOCK = 0xff
+const ALL_DAYS = [0, 1, 2, 3, 4, 5, 6]
+const WEEKDAYS = { Sun: 0, Mon: 1, Tue: 2, Wed: 3, Thu: 4, Fri: 5, Sat: 6 }
+
+export function parseClock(value) {
+  const match = /^(\d{1,2}):(\d{2})$/.exec(value || '')
+  if (!match || Number(match[1]) > 24 || Number(match[2]) > 59) {
+    throw new Error(`Invalid time "${value}", expected HH:MM`)
+  }
+  return Number(match[1]) * 60 + Number(match[2])
+}
+
+// Later blocks override earlier ones where they overlap
+export function compileSchedule(blocks) {
+  if (blocks.length >= NO_BLOCK) {
+    throw new Error(`A schedule supports at most ${NO_BLOCK - 1} blocks`)
+  }
+
+  const table = new Uint8Array(MINUTES_PER_WEEK).fill(NO_BLOCK)
+  blocks.forEach((block, index) => {
+    const start = parseClock(block.start) % MINUTES_PER_DAY
+    const end = parseClock(block.end) % MINUTES_PER_DAY
+    const length = end > start ? end - start : MINUTES_PER_DAY - start + end
+    for (const day of block.days || ALL_DAYS) {
+      const offset = day * MINUTES_PER_DAY + start
+      for (let minute = 0; minute < length; minute++) {
+        table[(offset + minute) % MINUTES_PER_WEEK] = index
+      }
+    }
+  })
+
+  // Minutes until the table changes value, walking backwards from a change point
+  const untilChange = new Uint16Array(MINUTES_PER_WEEK)
+  const change = table.findIndex((value, i) => value !== table[(i + MINUTES_PER_WEEK - 1) % MINUTES_PER_WEEK])
+  if (change === -1) {
+    untilChange.fill(MINUTES_PER_WEEK)
+  } else {
+    for (let step = 1; step <= MINUTES_PER_WEEK; step++) {
+      const i = (change - step + MINUTES_PER_WEEK) % MINUTES_PER_WEEK
+      const next = (i + 1) % MINUTES_PER_WEEK
+      untilChange[i] = table[i] === table[next] ? untilChange[next] + 1 : 1
+    }
+  }
+
+  return { blocks, table, untilChange }
+}
+
+const formatters = new Map()
+
+function getFormatter(timeZone) {
+  if (!formatters.has(timeZone)) {
+    // Throws RangeError for unknown IANA zones
+    formatters.set(timeZone, new Intl.DateTimeFormat('en-US', {
+      timeZone,
+      weekday: 'short',
+      hour: '2-digit',
+      minute: '2-digit',
+      hourCycle: 'h23'
+    }))
+  }
+  return formatters.get(timeZone)
+}
+
+export function isValidTimeZone(timeZone) {
+  try {
+    getFormatter(timeZone)
+    return true
+  } catch {
+    return false
+  }
+}
+
+export function localMinuteOfWeek(date, timeZone) {
+  const parts = Object.fromEntries(getFormatter(timeZone).formatToParts(date).map(part => [part.type, part.value]))
+  return WEEKDAYS[parts.weekday] * MINUTES_PER_DAY + Number(parts.hour) * 60 + Number(parts.minute)
+}
+
+// Active block at `now` in `timeZone`, the block after it and when it changes.
+// next_change_at adds elapsed minutes in absolute time, so on a DST transition
+// night it can be off by the size of the shift until the next resolution.
+export function resolveBlock(compiled, timeZone, now = new Date()) {
+  const minute = localMinuteOfWeek(now, timeZone)
+  const remaining = compiled.untilChange[minute]
+  const startOfMinute = now.getTime() - (now.getTime() % 60000)
+  const blockAt = i => compiled.table[i] === NO_BLOCK ? null : compiled.blocks[compiled.table[i]]
+
+  return {
+    block: blockAt(minute),
+    nextBlock: blockAt((minute + remaining) % MINUTES_PER_WEEK),
+    nextChangeAt: new Date(startOfMinute + remaining * 60000)
+  }
+}
@@ -6,6 +6,8 @@ const nextConfig = {
   experimental: {
     // Remove if not using Server Components
     serverComponentsExternalPackages: ['mongodb'],
+    // Enables instrumentation.js, which opens the Mongo pool at startup
+    instrumentationHook: true,
   },
   webpack(config, { dev }) {
     if (dev) {
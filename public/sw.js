@@ -0,0 +1,229 @@
+// Offline cache for the player. The page tells us which time blocks are current
+// and upcoming; their audio is precached whole and the catalog JSON is kept as a
+// fallback, so playback survives network outages. Audio is evicted least-recently-used
+// first once the storage budget is exceeded, and Range requests (seeking) are
+// answered from the cached file. Audio files can be replaced under the same URL,
+// so cached copies are revalidated against their ETag on every precache and, in
+// the background, when played after REVALIDATE_MS.
+//
+// Register as /sw.js?budget=<megabytes> to override the default budget.
+
+const AUDIO_CACHE = 'salil-audio-v1'
+const CATALOG_CACHE = 'salil-catalog-v1'
+const META_CACHE = 'salil-meta-v1'
+const LRU_KEY = '/__salil-audio-lru__'
+
+const CATALOG_PATHS = ['/api/schedule', '/api/current-playlist', '/api/time-blocks', '/api/playlists']
+const DEFAULT_BUDGET_MB = 200
+const REVALIDATE_MS = 5 * 60 * 1000
+
+let budgetBytes = (Number(new URL(self.location).searchParams.get('budget')) || DEFAULT_BUDGET_MB) * 1024 * 1024
+// URLs of the blocks the page asked us to keep; never evicted
+let protectedUrls = new Set()
+// url -> { size, etag, lastUsed, checkedAt }, persisted in META_CACHE so it survives worker restarts
+let lruIndex = null
+
+self.addEventListener('install', event => {
+  event.waitUntil(
+    caches.open(CATALOG_CACHE)
+      .then(cache => cache.addAll(['/api/schedule']))
+      .catch(() => {})
+      .then(() => self.skipWaiting())
+  )
+})
+
+self.addEventListener('activate', event => {
+  const current = [AUDIO_CACHE, CATALOG_CACHE, META_CACHE]
+  event.waitUntil(
+    caches.keys()
+      .then(names => Promise.all(names.filter(name => !current.includes(name)).map(name => caches.delete(name))))
+      .then(() => self.clients.claim())
+  )
+})
+
+async function loadIndex() {
+  if (!lruIndex) {
+    const cached = await (await caches.open(META_CACHE)).match(LRU_KEY)
+    lruIndex = cached ? await cached.json() : {}
+  }
+  return lruIndex
+}
+
+async function saveIndex() {
+  const cache = await caches.open(META_CACHE)
+  await cache.put(LRU_KEY, new Response(JSON.stringify(lruIndex), {
+    headers: { 'Content-Type': 'application/json' }
+  }))
+}
+
+// Store `url` in the cache unless the cached copy still matches the server's
+// (a 304 against its ETag). Offline or on errors the cached copy stays in use.
+async function refreshAudio(cache, index, url, cached) {
+  const entry = index[url]
+  const etag = cached && (entry?.etag || cached.headers.get('ETag'))
+  try {
+    // Bypass the HTTP cache so our own validator reaches the server
+    const response = await fetch(url, { cache: 'no-store', headers: etag ? { 'If-None-Match': etag } : {} })
+    if (response.status === 304) {
+      if (entry) entry.checkedAt = Date.now()
+      return
+    }
+    if (response.status !== 200) return
+    const size = Number(response.headers.get('Content-Length')) || (await response.clone().blob()).size
+    const etagHeader = response.headers.get('ETag')
+    await cache.put(url, response)
+    index[url] = { size, etag: etagHeader, lastUsed: entry?.lastUsed ?? Date.now(), checkedAt: Date.now() }
+  } catch (error) {
+    // Try again on the next precache message or play
+  }
+}
+
+// Mark a played file as recently used, revalidating it if it was last checked
+// more than REVALIDATE_MS ago
+async function touch(url, cached) {
+  const index = await loadIndex()
+  const entry = index[url]
+  if (!entry) return
+  entry.lastUsed = Date.now()
+  if (Date.now() - (entry.checkedAt || 0) > REVALIDATE_MS) {
+    // Claimed up front so concurrent Range requests check only once
+    entry.checkedAt = Date.now()
+    await refreshAudio(await caches.open(AUDIO_CACHE), index, url, cached)
+    await evictToBudget()
+  }
+  await saveIndex()
+}
+
+async function evictToBudget() {
+  const index = await loadIndex()
+  let total = Object.values(index).reduce((sum, entry) => sum + entry.size, 0)
+  if (total <= budgetBytes) return
+
+  const cache = await caches.open(AUDIO_CACHE)
+  const candidates = Object.entries(index)
+    .filter(([url]) => !protectedUrls.has(url))
+    .sort(([, a], [, b]) => a.lastUsed - b.lastUsed)
+
+  for (const [url, entry] of candidates) {
+    if (total <= budgetBytes) break
+    await cache.delete(url)
+    delete index[url]
+    total -= entry.size
+  }
+  await saveIndex()
+}
+
+async function precacheAudio(urls) {
+  const cache = await caches.open(AUDIO_CACHE)
+  const index = await loadIndex()
+
+  for (const url of urls) {
+    await refreshAudio(cache, index, url, await cache.match(url))
+    if (index[url]) index[url].lastUsed = Date.now()
+  }
+
+  await saveIndex()
+  await evictToBudget()
+}
+
+async function refreshCatalog(paths) {
+  const cache = await caches.open(CATALOG_CACHE)
+  await Promise.all(paths.map(path => cache.add(path).catch(() => {})))
+}
+
+// Messages from the page:
+//   { type: 'precache', urls: [...audio URLs for current + next block], catalog: [...paths] }
+//   { type: 'configure', budgetMb }
+self.addEventListener('message', event => {
+  const { type } = event.data || {}
+  if (type === 'precache') {
+    const urls = [...new Set(event.data.urls || [])]
+    protectedUrls = new Set(urls)
+    event.waitUntil(Promise.all([
+      precacheAudio(urls),
+      refreshCatalog(event.data.catalog || CATALOG_PATHS)
+    ]))
+  } else if (type === 'configure' && event.data.budgetMb > 0) {
+    budgetBytes = event.data.budgetMb * 1024 * 1024
+    event.waitUntil(evictToBudget())
+  }
+})
+
+// Single "bytes=" range against a cached body; mirrors parseByteRange in the API route
+function parseRange(header, size) {
+  const match = /^bytes=(\d*)-(\d*)$/.exec(header.trim())
+  if (!match || (match[1] === '' && match[2] === '')) return null
+
+  let start
+  let end
+  if (match[1] === '') {
+    const length = Number(match[2])
+    if (length === 0) return null
+    start = Math.max(size - length, 0)
+    end = size - 1
+  } else {
+    start = Number(match[1])
+    end = match[2] === '' ? size - 1 : Math.min(Number(match[2]), size - 1)
+  }
+  return start > end || start >= size ? null : { start, end }
+}
+
+async function serveCachedAudio(request, cached) {
+  const rangeHeader = request.headers.get('range')
+  if (!rangeHeader || rangeHeader.includes(',')) {
+    return cached
+  }
+
+  const blob = await cached.blob()
+  const range = parseRange(rangeHeader, blob.size)
+  const headers = new Headers(cached.headers)
+  headers.set('Accept-Ranges', 'bytes')
+
+  if (!range) {
+    headers.set('Content-Range', `bytes */${blob.size}`)
+    headers.delete('Content-Length')
+    return new Response(null, { status: 416, headers })
+  }
+
+  headers.set('Content-Range', `bytes ${range.start}-${range.end}/${blob.size}`)
+  headers.set('Content-Length', String(range.end - range.start + 1))
+  return new Response(blob.slice(range.start, range.end + 1), { status: 206, headers })
+}
+
+async function handleAudio(event) {
+  const cache = await caches.open(AUDIO_CACHE)
+  // Cache keys are range-less, so look up by URL alone
+  const cached = await cache.match(event.request.url)
+  if (cached) {
+    event.waitUntil(touch(new URL(event.request.url).pathname, cached))
+    return serveCachedAudio(event.request, cached)
+  }
+  return fetch(event.request)
+}
+
+// Network first so kiosks pick up catalog changes, cache when offline
+async function handleCatalog(request) {
+  const cache = await caches.open(CATALOG_CACHE)
+  try {
+    const response = await fetch(request)
+    if (response.ok) {
+      await cache.put(request.url, response.clone())
+    }
+    return response
+  } catch (error) {
+    const cached = await cache.match(request.url)
+    if (cached) return cached
+    throw error
+  }
+}
+
+self.addEventListener('fetch', event => {
+  const url = new URL(event.request.url)
+  if (event.request.method !== 'GET' || url.origin !== self.location.origin) return
+
+  if (url.pathname.startsWith('/api/audio/')) {
+    event.respondWith(handleAudio(event))
+  } else if (CATALOG_PATHS.includes(url.pathname)) {
+    event.respondWith(handleCatalog(event.request))
+  }
+})
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Offline audio analysis: waveform peaks and loudness for every MP3 in the music directory.
+
+Each file is decoded once (ffmpeg to 48 kHz float PCM) and analysed with NumPy in a
+process pool:
+
+- waveform: min/max sample per bucket for POINTS buckets, quantised to int8
+- integrated loudness: ITU-R BS.1770-4 (K-weighting, 400 ms blocks, absolute and
+  relative gating), in LUFS
+- sample peak in dBFS, and the gain that brings the track to TARGET_LUFS without
+  pushing the peak above PEAK_CEILING_DB
+
+Results are written as <content sha1>.wf files (format below) in the analysis
+directory, next to a manifest.json that maps each file path to its hash, size
+and mtime. Re-runs only decode files that are new or changed, and the manifest is
+saved after every file so an interrupted run resumes where it stopped. The API
+serves the results from GET /api/song/:id/waveform.
+
+    python scripts/analyze_audio.py [music_dir] [--out DIR] [--workers N] [--points N] [--force]
+
+Requires numpy and an ffmpeg binary on PATH.
+
+Binary format (little-endian):
+    magic       4s   b'SLWF'
+    version     u16  1
+    reserved    u16  0
+    sample_rate u32  decode rate, 48000
+    points      u32  number of waveform buckets
+    duration    f32  seconds
+    loudness    f32  integrated loudness, LUFS (-inf for digital silence)
+    peak        f32  sample peak, dBFS
+    gain        f32  suggested playback gain, dB
+    peaks       points * 2 * i8, (min, max) pairs scaled by 127
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import struct
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MUSIC_DIR = os.path.join(ROOT, 'public', 'music')
+DEFAULT_OUT_DIR = os.environ.get('ANALYSIS_DIR', os.path.join(ROOT, 'data', 'analysis'))
+
+SAMPLE_RATE = 48000
+DEFAULT_POINTS = 1024
+TARGET_LUFS = float(os.environ.get('TARGET_LUFS', -14.0))
+PEAK_CEILING_DB = -1.0
+
+MAGIC = b'SLWF'
+VERSION = 1
+HEADER = struct.Struct('<4sHHIIffff')
+
+# BS.1770 K-weighting at 48 kHz: high-shelf pre-filter then RLB high-pass, as (b, a)
+K_WEIGHTING = [
+    ([1.53512485958697, -2.69169618940638, 1.19839281085285],
+     [1.0, -1.69065929318241, 0.73248077421585]),
+    ([1.0, -2.0, 1.0],
+     [1.0, -1.99004745483398, 0.99007225036621]),
+]
+
+# The cascade is applied as a causal FIR of its impulse response, which has decayed
+# below 1e-17 after IMPULSE_LENGTH samples (slowest pole radius ~0.995)
+IMPULSE_LENGTH = 8192
+# Output samples per overlap-save block: a whole number of 100 ms loudness segments,
+# so peak filter memory is a few MB per worker whatever the track length
+FILTER_BLOCK = (SAMPLE_RATE // 10) * 25
+FFT_SIZE = 1 << (FILTER_BLOCK + IMPULSE_LENGTH - 2).bit_length()
+
+
+def sha1_file(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def decode(path):
+    """Decode to float32 PCM, shape (samples, channels), at SAMPLE_RATE"""
+    result = subprocess.run(
+        ['ffmpeg', '-v', 'error', '-nostdin', '-i', path,
+         '-f', 'f32le', '-acodec', 'pcm_f32le', '-ar', str(SAMPLE_RATE), '-ac', '2', '-'],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {result.stderr.decode(errors='replace').strip()}")
+    return np.frombuffer(result.stdout, dtype='<f4').reshape(-1, 2)
+
+
+def k_weighting_spectrum():
+    """Spectrum of the K-weighting impulse response, zero-padded to FFT_SIZE.
+
+    The cascade's complex response is evaluated on a fine frequency grid and
+    inverted to get the impulse response, which avoids a per-sample IIR loop
+    in Python.
+    """
+    size = 1 << 16
+    z = np.exp(-1j * np.pi * np.arange(size // 2 + 1) / (size // 2))
+    response = np.ones_like(z)
+    for b, a in K_WEIGHTING:
+        response *= np.polyval(b[::-1], z) / np.polyval(a[::-1], z)
+    impulse = np.fft.irfft(response, n=size)[:IMPULSE_LENGTH]
+    return np.fft.rfft(impulse, n=FFT_SIZE)
+
+
+K_SPECTRUM = k_weighting_spectrum()
+
+
+def k_weighted_energy(samples, segments, step):
+    """Energy of the K-weighted signal per `step`-sample segment, summed over channels.
+
+    Filtering is overlap-save in FILTER_BLOCK pieces: each block is transformed
+    together with the IMPULSE_LENGTH - 1 samples before it, and only the outputs
+    that wrap-around cannot reach are kept. Nothing track-sized is allocated.
+    """
+    history = IMPULSE_LENGTH - 1
+    total = segments * step
+    energy = np.empty(segments)
+    for start in range(0, total, FILTER_BLOCK):
+        end = min(start + FILTER_BLOCK, total)
+        chunk = samples[max(start - history, 0):end]
+        if start < history:
+            chunk = np.concatenate([np.zeros((history - start, samples.shape[1]), samples.dtype), chunk])
+        spectrum = np.fft.rfft(chunk, n=FFT_SIZE, axis=0) * K_SPECTRUM[:, None]
+        weighted = np.fft.irfft(spectrum, n=FFT_SIZE, axis=0)[history:history + end - start]
+        energy[start // step:end // step] = np.square(weighted).reshape(-1, step, samples.shape[1]).sum(axis=(1, 2))
+    return energy
+
+
+def integrated_loudness(samples):
+    """BS.1770-4 integrated loudness in LUFS; -inf when every block is gated out"""
+    step = SAMPLE_RATE // 10  # 100 ms: blocks are 400 ms with 75% overlap
+    segments = len(samples) // step
+    if segments < 4:
+        return float('-inf')
+
+    # Energy per 100 ms segment, summed over channels (L/R weights are 1)
+    energy = k_weighted_energy(samples, segments, step)
+    blocks = np.convolve(energy, np.ones(4), mode='valid') / (4 * step)
+
+    with np.errstate(divide='ignore'):
+        loudness = -0.691 + 10 * np.log10(blocks)
+    gated = blocks[loudness > -70.0]
+    if not len(gated):
+        return float('-inf')
+
+    relative_gate = -0.691 + 10 * np.log10(gated.mean()) - 10.0
+    with np.errstate(divide='ignore'):
+        gated = gated[-0.691 + 10 * np.log10(gated) > relative_gate]
+    return float(-0.691 + 10 * np.log10(gated.mean()))
+
+
+def waveform_peaks(samples, points):
+    """(min, max) of the mono mix over `points` equal buckets, as int8 pairs"""
+    mono = samples.mean(axis=1)
+    peaks = np.zeros((points, 2), dtype=np.int8)
+    if not len(mono):
+        return peaks
+
+    edges = np.linspace(0, len(mono), points + 1).astype(np.int64)
+    starts = np.minimum(edges[:-1], len(mono) - 1)
+    peaks[:, 0] = np.round(np.clip(np.minimum.reduceat(mono, starts), -1, 1) * 127)
+    peaks[:, 1] = np.round(np.clip(np.maximum.reduceat(mono, starts), -1, 1) * 127)
+    return peaks
+
+
+def analyze_samples(samples, points):
+    loudness = integrated_loudness(samples)
+    # max(|x|) without materialising a track-sized abs() copy
+    peak = float(max(samples.max(), -samples.min())) if len(samples) else 0.0
+    peak_db = 20 * np.log10(peak) if peak > 0 else float('-inf')
+
+    gain = 0.0
+    if np.isfinite(loudness):
+        gain = TARGET_LUFS - loudness
+        if np.isfinite(peak_db):
+            gain = min(gain, PEAK_CEILING_DB - peak_db)
+
+    return {
+        'duration': len(samples) / SAMPLE_RATE,
+        'loudness': loudness,
+        'peak': float(peak_db),
+        'gain': float(gain),
+        'peaks': waveform_peaks(samples, points),
+    }
+
+
+def encode(result):
+    header = HEADER.pack(MAGIC, VERSION, 0, SAMPLE_RATE, len(result['peaks']), result['duration'],
+                         result['loudness'], result['peak'], result['gain'])
+    return header + result['peaks'].tobytes()
+
+
+def analyze_file(path, content_hash, out_dir, points):
+    """Worker: decode, analyse and write <content_hash>.wf; returns the summary for the manifest"""
+    result = analyze_samples(decode(path), points)
+    target = os.path.join(out_dir, f"{content_hash}.wf")
+    # Write then rename so the API never reads a half-written file
+    temporary = f"{target}.{os.getpid()}.tmp"
+    with open(temporary, 'wb') as handle:
+        handle.write(encode(result))
+    os.replace(temporary, target)
+    return {
+        'duration': round(result['duration'], 3),
+        'loudness': round(result['loudness'], 2) if np.isfinite(result['loudness']) else None,
+        'peak': round(result['peak'], 2) if np.isfinite(result['peak']) else None,
+        'gain': round(result['gain'], 2),
+    }
+
+
+def load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, 'manifest.json')) as handle:
+            return json.load(handle)
+    except FileNotFoundError:
+        return {'version': VERSION, 'files': {}}
+
+
+def save_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, 'manifest.json')
+    with open(f"{path}.tmp", 'w') as handle:
+        json.dump(manifest, handle, indent=1, sort_keys=True)
+    os.replace(f"{path}.tmp", path)
+
+
+def find_mp3s(music_dir):
+    for directory, _, names in os.walk(music_dir):
+        for name in sorted(names):
+            if name.lower().endswith('.mp3'):
+                path = os.path.join(directory, name)
+                yield os.path.relpath(path, music_dir).replace(os.sep, '/'), path
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Precompute waveforms and loudness for the music library")
+    parser.add_argument('music_dir', nargs='?', default=DEFAULT_MUSIC_DIR)
+    parser.add_argument('--out', default=DEFAULT_OUT_DIR, help="Analysis directory (default: data/analysis)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Analysis processes")
+    parser.add_argument('--points', type=int, default=DEFAULT_POINTS, help="Waveform buckets per track")
+    parser.add_argument('--force', action='store_true', help="Re-analyse every file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    os.makedirs(args.out, exist_ok=True)
+    manifest = load_manifest(args.out)
+    if manifest.get('version') != VERSION:
+        manifest = {'version': VERSION, 'files': {}}
+    files = manifest['files']
+
+    # Unchanged size and mtime means unchanged content; otherwise rehash, and only
+    # decode when the content (or point count) actually differs from what's on disk
+    pending = []
+    seen = set()
+    for rel_path, path in find_mp3s(args.music_dir):
+        seen.add(rel_path)
+        stat = os.stat(path)
+        entry = files.get(rel_path)
+        unchanged = (entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns
+                     and entry.get('points') == args.points)
+        if unchanged and not args.force and os.path.exists(os.path.join(args.out, f"{entry['content_hash']}.wf")):
+            continue
+
+        content_hash = sha1_file(path)
+        if (entry and entry['content_hash'] == content_hash and entry.get('points') == args.points
+                and not args.force and os.path.exists(os.path.join(args.out, f"{content_hash}.wf"))):
+            entry.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+            continue
+        pending.append((rel_path, path, content_hash, stat))
+
+    removed = [rel_path for rel_path in files if rel_path not in seen]
+    for rel_path in removed:
+        del files[rel_path]
+
+    print(f"🎚️  {len(pending)} to analyse, {len(seen) - len(pending)} up to date, "
+          f"{len(removed)} removed ({args.workers} workers)")
+
+    started = time.perf_counter()
+    failures = 0
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        futures = {
+            pool.submit(analyze_file, path, content_hash, args.out, args.points): (rel_path, content_hash, stat)
+            for rel_path, path, content_hash, stat in pending
+        }
+        for future in as_completed(futures):
+            rel_path, content_hash, stat = futures[future]
+            try:
+                summary = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"❌ {rel_path}: {e}")
+                continue
+            files[rel_path] = {
+                'content_hash': content_hash,
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'points': args.points,
+                **summary,
+            }
+            save_manifest(args.out, manifest)
+            print(f"✅ {rel_path}: {summary['loudness']} LUFS, peak {summary['peak']} dBFS, gain {summary['gain']:+} dB")
+
+    # Drop analysis files no manifest entry refers to any more
+    live = {entry['content_hash'] for entry in files.values()}
+    for name in os.listdir(args.out):
+        if name.endswith('.wf') and name[:-3] not in live:
+            os.remove(os.path.join(args.out, name))
+
+    save_manifest(args.out, manifest)
+    print(f"🏁 Analysed {len(pending) - failures} files in {time.perf_counter() - started:.1f}s, {failures} failed")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
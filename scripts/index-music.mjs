@@ -0,0 +1,491 @@
+// Audio library indexer: walks a music directory, reads ID3 tags plus duration and
+// bitrate from the MPEG frame headers, hashes file contents and bulk-upserts the
+// results into the `songs` collection.
+//
+// Re-runs are incremental: files whose size and mtime match the stored document
+// are skipped, and every batch is flushed as it fills, so an interrupted scan
+// resumes where it stopped.
+//
+//   node --env-file=.env scripts/index-music.mjs [dir] [--workers N] [--batch N] [--prune]
+
+import { createHash } from 'crypto'
+import { createReadStream, promises as fs } from 'fs'
+import os from 'os'
+import path from 'path'
+import { fileURLToPath } from 'url'
+import { Worker, isMainThread, parentPort } from 'worker_threads'
+
+const DEFAULT_DIR = path.join(process.cwd(), 'public', 'music')
+
+// ---------------------------------------------------------------------------
+// MP3 parsing (runs inside workers)
+// ---------------------------------------------------------------------------
+
+// Bitrates in kbps indexed by [table][bitrate index]
+const BITRATES = {
+  'v1-l1': [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+  'v1-l2': [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+  'v1-l3': [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+  'v2-l1': [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+  'v2-l23': [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160]
+}
+
+const SAMPLE_RATES = {
+  3: [44100, 48000, 32000], // MPEG 1
+  2: [22050, 24000, 16000], // MPEG 2
+  0: [11025, 12000, 8000] // MPEG 2.5
+}
+
+function parseFrameHeader(buf, offset) {
+  if (buf[offset] !== 0xff || (buf[offset + 1] & 0xe0) !== 0xe0) {
+    return null
+  }
+
+  const versionBits = (buf[offset + 1] >> 3) & 0x03
+  const layerBits = (buf[offset + 1] >> 1) & 0x03
+  const bitrateIndex = buf[offset + 2] >> 4
+  const sampleRateIndex = (buf[offset + 2] >> 2) & 0x03
+  const padding = (buf[offset + 2] >> 1) & 0x01
+  const channelMode = buf[offset + 3] >> 6
+
+  if (versionBits === 1 || layerBits === 0 || bitrateIndex === 0 || bitrateIndex === 15 || sampleRateIndex === 3) {
+    return null
+  }
+
+  const mpeg1 = versionBits === 3
+  const layer = 4 - layerBits
+  const table = mpeg1 ? `v1-l${layer}` : (layer === 1 ? 'v2-l1' : 'v2-l23')
+  const bitrate = BITRATES[table][bitrateIndex]
+  const sampleRate = SAMPLE_RATES[versionBits][sampleRateIndex]
+
+  let samplesPerFrame
+  let frameLength
+  if (layer === 1) {
+    samplesPerFrame = 384
+    frameLength = Math.floor((12 * bitrate * 1000) / sampleRate + padding) * 4
+  } else {
+    samplesPerFrame = layer === 3 && !mpeg1 ? 576 : 1152
+    frameLength = Math.floor((samplesPerFrame / 8) * bitrate * 1000 / sampleRate) + padding
+  }
+
+  return { mpeg1, layer, bitrate, sampleRate, samplesPerFrame, frameLength, mono: channelMode === 3 }
+}
+
+// Locate the first real frame: a valid header whose successor also syncs
+function findFirstFrame(buf) {
+  for (let i = 0; i + 4 <= buf.length; i++) {
+    const header = parseFrameHeader(buf, i)
+    if (!header) continue
+    const next = i + header.frameLength
+    if (next + 4 > buf.length || parseFrameHeader(buf, next)) {
+      return { offset: i, header }
+    }
+  }
+  return null
+}
+
+// Frame count from a Xing/Info or VBRI header in the first frame, if present
+function readVbrFrameCount(buf, offset, header) {
+  const sideInfo = header.mpeg1 ? (header.mono ? 17 : 32) : (header.mono ? 9 : 17)
+  const xing = offset + 4 + sideInfo
+  const tag = buf.toString('latin1', xing, xing + 4)
+  if ((tag === 'Xing' || tag === 'Info') && xing + 12 <= buf.length) {
+    const flags = buf.readUInt32BE(xing + 4)
+    return flags & 0x01 ? buf.readUInt32BE(xing + 8) : null
+  }
+
+  const vbri = offset + 4 + 32
+  if (buf.toString('latin1', vbri, vbri + 4) === 'VBRI' && vbri + 18 <= buf.length) {
+    return buf.readUInt32BE(vbri + 14)
+  }
+  return null
+}
+
+function syncsafe(buf, offset) {
+  return (buf[offset] << 21) | (buf[offset + 1] << 14) | (buf[offset + 2] << 7) | buf[offset + 3]
+}
+
+function decodeText(buf) {
+  if (buf.length === 0) return ''
+  const encoding = buf[0]
+  let body = buf.subarray(1)
+  let text
+  if (encoding === 1 || encoding === 2) {
+    let bigEndian = encoding === 2
+    if (body[0] === 0xfe && body[1] === 0xff) {
+      bigEndian = true
+      body = body.subarray(2)
+    } else if (body[0] === 0xff && body[1] === 0xfe) {
+      body = body.subarray(2)
+    }
+    const copy = Buffer.from(body.subarray(0, body.length - (body.length % 2)))
+    if (bigEndian) copy.swap16()
+    text = copy.toString('utf16le')
+  } else {
+    text = body.toString(encoding === 3 ? 'utf8' : 'latin1')
+  }
+  return text.replace(/\0[\s\S]*$/, '').trim()
+}
+
+const ID3_FRAMES = {
+  TIT2: 'title', TPE1: 'artist', TALB: 'album',
+  TT2: 'title', TP1: 'artist', TAL: 'album'
+}
+
+function parseId3v2(tag, majorVersion, flags) {
+  const tags = {}
+  let offset = 0
+
+  if (flags & 0x40 && majorVersion >= 3) {
+    // Extended header: v2.3 size excludes its own 4 bytes, v2.4 includes them
+    offset = majorVersion === 4 ? syncsafe(tag, 0) : tag.readUInt32BE(0) + 4
+  }
+
+  const headerSize = majorVersion === 2 ? 6 : 10
+  while (offset + headerSize <= tag.length) {
+    let id
+    let size
+    if (majorVersion === 2) {
+      id = tag.toString('latin1', offset, offset + 3)
+      size = tag.readUIntBE(offset + 3, 3)
+    } else {
+      id = tag.toString('latin1', offset, offset + 4)
+      size = majorVersion === 4 ? syncsafe(tag, offset + 4) : tag.readUInt32BE(offset + 4)
+    }
+    if (!/^[A-Z0-9]+$/.test(id) || size <= 0) {
+      break // padding or garbage
+    }
+
+    const field = ID3_FRAMES[id]
+    if (field && !tags[field]) {
+      tags[field] = decodeText(tag.subarray(offset + headerSize, offset + headerSize + size))
+    }
+    offset += headerSize + size
+  }
+  return tags
+}
+
+function parseId3v1(buf) {
+  if (buf.length < 128 || buf.toString('latin1', 0, 3) !== 'TAG') {
+    return {}
+  }
+  const field = (start, length) => buf.toString('latin1', start, start + length).replace(/\0[\s\S]*$/, '').trim()
+  return { title: field(3, 30), artist: field(33, 30), album: field(63, 30) }
+}
+
+async function hashFile(filePath) {
+  const hash = createHash('sha1')
+  for await (const chunk of createReadStream(filePath, { highWaterMark: 1 << 20 })) {
+    hash.update(chunk)
+  }
+  return hash.digest('hex')
+}
+
+async function readMp3Metadata(filePath, size) {
+  const handle = await fs.open(filePath, 'r')
+  try {
+    const head = Buffer.alloc(10)
+    await handle.read(head, 0, 10, 0)
+
+    let tags = {}
+    let audioStart = 0
+    if (head.toString('latin1', 0, 3) === 'ID3') {
+      const majorVersion = head[3]
+      const flags = head[5]
+      const tagSize = syncsafe(head, 6)
+      const tag = Buffer.alloc(Math.min(tagSize, size - 10))
+      await handle.read(tag, 0, tag.length, 10)
+      tags = parseId3v2(tag, majorVersion, flags)
+      audioStart = 10 + tagSize + (flags & 0x10 ? 10 : 0)
+    }
+
+    const tail = Buffer.alloc(Math.min(128, size))
+    await handle.read(tail, 0, tail.length, size - tail.length)
+    const v1 = parseId3v1(tail)
+    tags = { ...v1, ...Object.fromEntries(Object.entries(tags).filter(([, value]) => value)) }
+
+    const probe = Buffer.alloc(Math.min(64 * 1024, Math.max(size - audioStart, 0)))
+    await handle.read(probe, 0, probe.length, audioStart)
+    const first = findFirstFrame(probe)
+
+    let duration = null
+    let bitrate = null
+    let sampleRate = null
+    if (first) {
+      const { header, offset } = first
+      sampleRate = header.sampleRate
+      const audioBytes = size - audioStart - offset - (v1.title !== undefined ? 128 : 0)
+      const frames = readVbrFrameCount(probe, offset, header)
+      if (frames) {
+        duration = (frames * header.samplesPerFrame) / header.sampleRate
+        bitrate = Math.round((audioBytes * 8) / duration / 1000)
+      } else {
+        bitrate = header.bitrate
+        duration = (audioBytes * 8) / (header.bitrate * 1000)
+      }
+    }
+
+    return {
+      title: tags.title || null,
+      artist: tags.artist || null,
+      album: tags.album || null,
+      duration: duration === null ? null : Math.round(duration * 1000) / 1000,
+      bitrate,
+      sample_rate: sampleRate
+    }
+  } finally {
+    await handle.close()
+  }
+}
+
+async function indexFile({ absPath, relPath, size, mtimeMs }) {
+  const [metadata, contentHash] = await Promise.all([readMp3Metadata(absPath, size), hashFile(absPath)])
+  const fallbackTitle = path.basename(relPath, path.extname(relPath))
+
+  return {
+    file_path: relPath,
+    url: `/api/audio/${relPath.split(path.sep).map(encodeURIComponent).join('/')}`,
+    title: metadata.title || fallbackTitle,
+    artist: metadata.artist || 'Unknown Artist',
+    album: metadata.album,
+    duration: metadata.duration,
+    bitrate: metadata.bitrate,
+    sample_rate: metadata.sample_rate,
+    content_hash: contentHash,
+    size,
+    mtime_ms: mtimeMs
+  }
+}
+
+// ---------------------------------------------------------------------------
+// Main thread: directory walk, worker pool and batched upserts
+// ---------------------------------------------------------------------------
+
+function parseArgs(argv) {
+  const options = { dir: DEFAULT_DIR, workers: Math.max(os.cpus().length - 1, 1), batch: 1000, prune: false }
+  for (let i = 0; i < argv.length; i++) {
+    const arg = argv[i]
+    if (arg === '--workers') options.workers = Number(argv[++i])
+    else if (arg === '--batch') options.batch = Number(argv[++i])
+    else if (arg === '--prune') options.prune = true
+    else options.dir = path.resolve(arg)
+  }
+  return options
+}
+
+async function* walk(dir, root = dir) {
+  // opendir streams entries so huge directories never materialize as one array
+  for await (const entry of await fs.opendir(dir)) {
+    const absPath = path.join(dir, entry.name)
+    if (entry.isDirectory()) {
+      yield* walk(absPath, root)
+    } else if (entry.isFile() && path.extname(entry.name).toLowerCase() === '.mp3') {
+      yield { absPath, relPath: path.relative(root, absPath) }
+    }
+  }
+}
+
+class WorkerPool {
+  constructor(size) {
+    this.idle = []
+    this.waiting = []
+    // Task callbacks by worker, so a crashed worker's task can be failed
+    this.tasks = new Map()
+    this.closing = false
+    this.workers = new Set()
+    for (let i = 0; i < size; i++) {
+      this.release(this.spawn())
+    }
+  }
+
+  spawn() {
+    const worker = new Worker(fileURLToPath(import.meta.url))
+    worker.on('message', ({ result, error }) => {
+      const { resolve, reject } = this.tasks.get(worker)
+      this.tasks.delete(worker)
+      this.release(worker)
+      error ? reject(new Error(error)) : resolve(result)
+    })
+    // A worker that throws outside a task (e.g. out of memory) also exits, so
+    // the error is only recorded here and handled once on exit
+    worker.on('error', error => {
+      worker.failure = error
+    })
+    worker.on('exit', code => {
+      this.workers.delete(worker)
+      this.idle = this.idle.filter(candidate => candidate !== worker)
+      const task = this.tasks.get(worker)
+      this.tasks.delete(worker)
+      task?.reject(worker.failure || new Error(`Worker exited with code ${code}`))
+      if (!this.closing) {
+        this.release(this.spawn())
+      }
+    })
+    this.workers.add(worker)
+    return worker
+  }
+
+  acquire() {
+    if (this.idle.length) return Promise.resolve(this.idle.pop())
+    return new Promise(resolve => this.waiting.push(resolve))
+  }
+
+  release(worker) {
+    const next = this.waiting.shift()
+    next ? next(worker) : this.idle.push(worker)
+  }
+
+  async run(task) {
+    const worker = await this.acquire()
+    return new Promise((resolve, reject) => {
+      this.tasks.set(worker, { resolve, reject })
+      worker.postMessage({ task })
+    })
+  }
+
+  close() {
+    this.closing = true
+    return Promise.all([...this.workers].map(worker => worker.terminate()))
+  }
+}
+
+// Bump the catalog version the API serves from, exactly as publishCatalogChange
+// in lib/catalog.js does, so running servers drop their cached reads
+async function publishCatalogChange(db, change) {
+  const meta = await db.collection('meta').findOneAndUpdate(
+    { _id: 'catalog' },
+    { $inc: { version: 1 }, $set: { last_change: change, updated_at: new Date() } },
+    { upsert: true, returnDocument: 'after' }
+  )
+  return meta.version
+}
+
+async function main() {
+  const { MongoClient } = await import('mongodb')
+  const { v4: uuidv4 } = await import('uuid')
+  const options = parseArgs(process.argv.slice(2))
+
+  const client = new MongoClient(process.env.MONGO_URL)
+  await client.connect()
+  const db = client.db(process.env.DB_NAME || 'salil_music_db')
+  const songs = db.collection('songs')
+  await songs.createIndex(
+    { file_path: 1 },
+    { unique: true, partialFilterExpression: { file_path: { $exists: true } } }
+  )
+
+  // Size and mtime of everything indexed so far, for the incremental skip check
+  const known = new Map()
+  const cursor = songs.find(
+    { file_path: { $exists: true } },
+    { projection: { _id: 0, file_path: 1, size: 1, mtime_ms: 1 } }
+  )
+  for await (const doc of cursor) {
+    known.set(doc.file_path, doc)
+  }
+
+  const pool = new WorkerPool(options.workers)
+  const stats = { scanned: 0, skipped: 0, indexed: 0, failed: 0, pruned: 0 }
+  const seen = new Set()
+  const inFlight = new Set()
+  let ops = []
+  const started = Date.now()
+
+  const flush = async () => {
+    if (!ops.length) return
+    const batch = ops
+    ops = []
+    await songs.bulkWrite(batch, { ordered: false })
+  }
+
+  const indexed = async file => {
+    try {
+      const doc = await pool.run(file)
+      ops.push({
+        updateOne: {
+          filter: { file_path: doc.file_path },
+          update: {
+            $set: { ...doc, indexed_at: new Date() },
+            // Playlist assignment is managed elsewhere and must survive re-scans
+            $setOnInsert: { id: uuidv4(), playlist_id: null, time_block: null }
+          },
+          upsert: true
+        }
+      })
+      stats.indexed++
+    } catch (error) {
+      stats.failed++
+      console.error(`Failed to index ${file.relPath}:`, error.message)
+    }
+  }
+
+  try {
+    for await (const { absPath, relPath } of walk(options.dir)) {
+      stats.scanned++
+      seen.add(relPath)
+
+      const stat = await fs.stat(absPath)
+      const previous = known.get(relPath)
+      if (previous && previous.size === stat.size && previous.mtime_ms === stat.mtimeMs) {
+        stats.skipped++
+        continue
+      }
+
+      // Keep a bounded number of files queued so memory stays flat on huge libraries
+      const task = indexed({ absPath, relPath, size: stat.size, mtimeMs: stat.mtimeMs })
+      inFlight.add(task)
+      task.finally(() => inFlight.delete(task))
+      if (inFlight.size >= options.workers * 4) {
+        await Promise.race(inFlight)
+      }
+      if (ops.length >= options.batch) {
+        await flush()
+      }
+
+      if (stats.scanned % 10000 === 0) {
+        console.log(`Scanned ${stats.scanned} files (${stats.indexed} indexed, ${stats.skipped} unchanged)`)
+      }
+    }
+
+    await Promise.all(inFlight)
+    await flush()
+
+    if (options.prune) {
+      const missing = [...known.keys()].filter(filePath => !seen.has(filePath))
+      for (let i = 0; i < missing.length; i += options.batch) {
+        const result = await songs.deleteMany({ file_path: { $in: missing.slice(i, i + options.batch) } })
+        stats.pruned += result.deletedCount
+      }
+    }
+  } finally {
+    await pool.close()
+    // Also after a failed run, since earlier batches may already have been written
+    if (stats.indexed || stats.pruned) {
+      await publishCatalogChange(db, { collection: 'songs', type: 'index', indexed: stats.indexed, pruned: stats.pruned })
+        .catch(error => console.error('Failed to publish catalog change:', error.message))
+    }
+    await client.close()
+  }
+
+  const seconds = (Date.now() - started) / 1000
+  console.log(
+    `Indexed ${options.dir} in ${seconds.toFixed(1)}s: ${stats.scanned} scanned, ${stats.indexed} indexed, ` +
+    `${stats.skipped} unchanged, ${stats.failed} failed, ${stats.pruned} pruned`
+  )
+  if (stats.failed) process.exitCode = 1
+}
+
+if (isMainThread) {
+  main().catch(error => {
+    console.error('Indexer failed:', error)
+    process.exit(1)
+  })
+} else {
+  parentPort.on('message', async ({ task }) => {
+    try {
+      parentPort.postMessage({ result: await indexFile(task) })
+    } catch (error) {
+      parentPort.postMessage({ error: error.message })
+    }
+  })
+}